@@ -0,0 +1,47 @@
+"""Latency and upstream-call counts for description generation, fully offline.
+
+    python -m benchmarks.ai_descriptions --requests 50 --distinct 5 --latency 0.5
+
+Fires `requests` concurrent generations spread over `distinct` products
+against the fake AI client, then repeats them against a warm cache.
+"""
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.common import load_app, summarize
+
+load_app()
+
+from core.ai_client import FakeClient
+from core.database import db
+from controllers.ai_controller import DescriptionService
+
+
+async def timed(service, name):
+    start = time.perf_counter()
+    await service.generate(name, "ring")
+    return time.perf_counter() - start
+
+
+async def main(args):
+    await db.ai_descriptions.delete_many({})
+    client = FakeClient(latency=args.latency)
+    service = DescriptionService(client)
+    names = [f"Benchmark Ring {i % args.distinct}" for i in range(args.requests)]
+
+    results = {}
+    for phase in ("cold", "warm"):
+        calls_before = client.calls
+        latencies = await asyncio.gather(*(timed(service, n) for n in names))
+        results[phase] = {**summarize(latencies), "upstream_calls": client.calls - calls_before}
+    results["counters"] = service.stats()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--distinct", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
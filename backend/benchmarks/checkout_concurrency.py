@@ -0,0 +1,73 @@
+"""Concurrent checkouts racing for limited stock.
+
+    python -m benchmarks.checkout_concurrency --buyers 200 --stock 50
+
+Every buyer has the same product in their cart and all of them place an
+order at once. Reports orders per second and fails if stock goes negative
+or the number of successful orders doesn't match the stock consumed.
+"""
+import argparse
+import asyncio
+import json
+import time
+from bson import ObjectId
+from benchmarks.common import load_app, app_client
+
+app = load_app()
+
+from core.database import db
+from core.jwt_handler import create_access_token
+
+
+async def seed(buyers: int, stock: int, quantity: int):
+    product_id = ObjectId()
+    await db.products.insert_one({
+        "_id": product_id, "name": "Contested Ring", "price": 250.0, "stock": stock, "images": []
+    })
+    user_ids = [ObjectId() for _ in range(buyers)]
+    await db.cart_items.insert_many([
+        {"user_id": uid, "product_id": product_id, "quantity": quantity} for uid in user_ids
+    ])
+    return product_id, user_ids
+
+
+async def main(args):
+    product_id, user_ids = await seed(args.buyers, args.stock, args.quantity)
+    headers = [
+        {"Authorization": "Bearer " + create_access_token({"id": str(uid), "email": "b@example.com", "role": "user"})}
+        for uid in user_ids
+    ]
+
+    async with app_client(app) as client:
+        async def checkout(h):
+            response = await client.post("/api/orders/place-order", json={"shipping_address": "1 Bench St"}, headers=h)
+            return response.status_code
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(checkout(h) for h in headers))
+        elapsed = time.perf_counter() - start
+        # Read while the lifespan still holds the connection open
+        product = await db.products.find_one({"_id": product_id})
+
+    placed = statuses.count(200)
+    result = {
+        "buyers": args.buyers,
+        "placed": placed,
+        "rejected": len(statuses) - placed,
+        "elapsed_s": round(elapsed, 3),
+        "orders_per_s": round(placed / elapsed, 1) if elapsed else 0.0,
+        "final_stock": product["stock"],
+        "expected_stock": args.stock - placed * args.quantity,
+    }
+    print(json.dumps(result, indent=2))
+
+    if product["stock"] < 0 or product["stock"] != result["expected_stock"]:
+        raise SystemExit("stock invariant violated")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--quantity", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""Helpers shared by the benchmark scripts.
+
+Run the scripts from backend/, e.g. `python -m benchmarks.login_storm`.
+They use the MongoDB at MONGO_URI (database MONGO_DB_NAME, defaulting to
+smf_jewels_bench so real data is never touched), or an in-process fake
+when MONGO_URI is unset or BENCH_FAKE_DB=1 (needs `mongomock-motor`).
+"""
+import json
+import os
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+
+def load_app():
+    load_dotenv()
+    os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+    # The benchmarks drive every request from one client; measure the app, not the limiter
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    if not os.getenv("MONGO_DB_NAME"):
+        os.environ["MONGO_DB_NAME"] = "smf_jewels_bench"
+
+    if not os.getenv("MONGO_URI") or os.getenv("BENCH_FAKE_DB"):
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("Set MONGO_URI or install mongomock-motor to run the benchmarks")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    from main import app
+    return app
+
+
+@asynccontextmanager
+async def app_client(app):
+    import httpx
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def write_results(path: str, results: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def compare_to_baseline(current: dict, baseline: dict, metrics=("p95_ms", "p99_ms"), tolerance: float = 0.2) -> list:
+    """Every (name, metric, baseline, current) that got worse by more than `tolerance`.
+
+    Both arguments map a name (an endpoint, say) to a `summarize()` dict.
+    Names missing from either side are skipped.
+    """
+    regressions = []
+    for name, stats in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in metrics:
+            old, new = before.get(metric), stats.get(metric)
+            # Ignore sub-millisecond noise on very fast endpoints
+            if old is None or new is None or new - old < 1.0:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append((name, metric, old, new))
+    return regressions
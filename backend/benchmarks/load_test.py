@@ -0,0 +1,180 @@
+"""Mixed-traffic load test with per-endpoint latency percentiles.
+
+    python -m benchmarks.load_test --users 50 --duration 20
+    python -m benchmarks.load_test --baseline benchmarks/results/baseline.json
+
+Virtual users loop over weighted scenarios (browse, add-to-cart, checkout,
+admin listing) against the app in-process. Throughput and p50/p95/p99 per
+endpoint (method + route template) are written as JSON to --output. With
+--baseline, any endpoint whose p95/p99 grew by more than --tolerance is
+reported and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from bson import ObjectId
+from benchmarks.common import load_app, app_client, summarize, write_results, compare_to_baseline
+
+app = load_app()
+
+from core.database import db
+from core.jwt_handler import create_access_token
+
+DEFAULT_OUTPUT = "benchmarks/results/load_test.json"
+
+SCENARIO_WEIGHTS = {"browse": 60, "add_to_cart": 25, "checkout": 10, "admin_listing": 5}
+
+
+async def seed(products: int, shoppers: int):
+    for name in ("products", "categories", "cart_items", "orders"):
+        await db[name].delete_many({})
+    category_ids = (await db.categories.insert_many([
+        {"name": name, "slug": name.lower(), "image": None}
+        for name in ("Rings", "Necklaces", "Earrings", "Bracelets")
+    ])).inserted_ids
+    product_ids = (await db.products.insert_many([
+        {
+            "name": f"Load Ring {i}",
+            "price": 100 + i % 900,
+            "category": str(category_ids[i % len(category_ids)]),
+            "description": "Solid gold ring with a brilliant-cut stone.",
+            "shortDescription": "Solid gold ring.",
+            "sku": f"LOAD-{i:06d}",
+            # Plenty of stock, so checkouts measure the write path rather than rejections
+            "stock": 1_000_000,
+            "featured": i % 10 == 0,
+            "images": [],
+        }
+        for i in range(products)
+    ])).inserted_ids
+    shoppers = [
+        {"Authorization": "Bearer " + create_access_token({"id": str(ObjectId()), "email": f"u{i}@example.com", "role": "user"})}
+        for i in range(shoppers)
+    ]
+    admin = {"Authorization": "Bearer " + create_access_token({"id": str(ObjectId()), "email": "admin@example.com", "role": "admin"})}
+    return [str(p) for p in product_ids], [str(c) for c in category_ids], shoppers, admin
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def call(self, client, method: str, label: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        key = f"{method} {label}"
+        self.latencies.setdefault(key, []).append(elapsed)
+        if response.status_code >= 400:
+            self.errors[key] = self.errors.get(key, 0) + 1
+        return response
+
+
+async def browse(client, rec, rng, ctx):
+    await rec.call(client, "GET", "/api/products/all", "/api/products/all", params={"limit": 24})
+    await rec.call(client, "GET", "/api/category/all-categories", "/api/category/all-categories")
+    await rec.call(client, "GET", "/api/products/search", "/api/products/search",
+                   params={"category": rng.choice(ctx["categories"]), "sort": "price_asc", "limit": 24})
+    await rec.call(client, "GET", "/api/products/{product_id}", f"/api/products/{rng.choice(ctx['products'])}")
+
+
+async def add_to_cart(client, rec, rng, ctx):
+    headers = rng.choice(ctx["shoppers"])
+    await rec.call(client, "POST", "/api/cart/", "/api/cart/", headers=headers,
+                   json={"product_id": rng.choice(ctx["products"]), "quantity": 1})
+    await rec.call(client, "GET", "/api/cart/get-cart", "/api/cart/get-cart", headers=headers)
+
+
+async def checkout(client, rec, rng, ctx):
+    headers = rng.choice(ctx["shoppers"])
+    await rec.call(client, "POST", "/api/cart/", "/api/cart/", headers=headers,
+                   json={"product_id": rng.choice(ctx["products"]), "quantity": 1})
+    await rec.call(client, "POST", "/api/orders/place-order", "/api/orders/place-order", headers=headers,
+                   json={"shipping_address": "1 Load Test Street"})
+
+
+async def admin_listing(client, rec, rng, ctx):
+    await rec.call(client, "GET", "/api/orders/all-users-orders", "/api/orders/all-users-orders",
+                   headers=ctx["admin"], params={"limit": 50})
+    await rec.call(client, "GET", "/api/products/all", "/api/products/all",
+                   params={"limit": 100})
+
+
+SCENARIOS = {"browse": browse, "add_to_cart": add_to_cart, "checkout": checkout, "admin_listing": admin_listing}
+
+
+async def run(client, ctx, users: int, duration: float, seed: int):
+    rec = Recorder()
+    scenario_latencies = {name: [] for name in SCENARIOS}
+    names = list(SCENARIO_WEIGHTS)
+    weights = [SCENARIO_WEIGHTS[n] for n in names]
+    deadline = time.perf_counter() + duration
+
+    async def virtual_user(index: int):
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            await SCENARIOS[name](client, rec, rng, ctx)
+            scenario_latencies[name].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user(i) for i in range(users)))
+    elapsed = time.perf_counter() - start
+
+    endpoints = {
+        key: {**summarize(samples), "rps": round(len(samples) / elapsed, 1), "errors": rec.errors.get(key, 0)}
+        for key, samples in sorted(rec.latencies.items())
+    }
+    scenarios = {
+        name: {**summarize(samples), "rps": round(len(samples) / elapsed, 1)}
+        for name, samples in scenario_latencies.items() if samples
+    }
+    return elapsed, endpoints, scenarios
+
+
+async def main(args):
+    products, categories, shoppers, admin = await seed(args.products, args.shoppers)
+    ctx = {"products": products, "categories": categories, "shoppers": shoppers, "admin": admin}
+
+    async with app_client(app) as client:
+        elapsed, endpoints, scenarios = await run(client, ctx, args.users, args.duration, args.seed)
+
+    results = {
+        "config": {
+            "users": args.users, "duration_s": args.duration, "products": args.products,
+            "shoppers": args.shoppers, "seed": args.seed, "weights": SCENARIO_WEIGHTS,
+        },
+        "elapsed_s": round(elapsed, 2),
+        "total_rps": round(sum(e["count"] for e in endpoints.values()) / elapsed, 1),
+        "endpoints": endpoints,
+        "scenarios": scenarios,
+    }
+    write_results(args.output, results)
+    print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(endpoints, baseline["endpoints"], tolerance=args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"REGRESSION {name} {metric}: {old} -> {new}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--shoppers", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
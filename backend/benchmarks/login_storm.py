@@ -0,0 +1,92 @@
+"""Catalog latency while a burst of logins is hashing passwords.
+
+    python -m benchmarks.login_storm --logins 40 --catalog-requests 200
+
+Runs the same storm twice: once with bcrypt executed inline on the event
+loop (the old behaviour) and once through the password pool, and prints
+catalog p50/p99 for each.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from benchmarks.common import load_app, app_client, summarize
+
+app = load_app()
+
+from core.database import db
+from core.cpu_pool import password_pool
+from controllers.auth_controller import pwd_context
+
+EMAIL = "storm@example.com"
+PASSWORD = "storm-password"
+
+
+async def seed(products: int):
+    await db.users.delete_many({"email": EMAIL})
+    await db.users.insert_one({
+        "name": "Storm",
+        "email": EMAIL,
+        "password": pwd_context.hash(PASSWORD),
+        "role": "user",
+        "created_at": datetime.utcnow(),
+    })
+    await db.products.delete_many({"sku": {"$regex": "^STORM-"}})
+    await db.products.insert_many([
+        {"name": f"Ring {i}", "price": 100 + i, "stock": 10, "sku": f"STORM-{i}", "images": []}
+        for i in range(products)
+    ])
+
+
+async def run_storm(client, logins: int, catalog_requests: int, interval: float):
+    # Open-loop schedule: latency is measured from when each request was due,
+    # so time spent waiting behind a blocked event loop is counted.
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    duration = catalog_requests * interval
+
+    async def wait_until(due):
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+    async def login(due):
+        await wait_until(due)
+        response = await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def browse(due):
+        await wait_until(due)
+        await client.get("/api/products/all?limit=20")
+        latencies.append(time.perf_counter() - due)
+
+    tasks = [login(start + duration * i / logins) for i in range(logins)]
+    tasks += [browse(start + interval * i) for i in range(catalog_requests)]
+    await asyncio.gather(*tasks)
+    return {"catalog": summarize(latencies), "login_statuses": statuses}
+
+
+async def main(args):
+    await seed(args.products)
+    results = {}
+    async with app_client(app) as client:
+        original_run = password_pool.run
+
+        async def inline_run(fn, *fn_args):
+            return fn(*fn_args)
+
+        password_pool.run = inline_run
+        results["inline"] = await run_storm(client, args.logins, args.catalog_requests, args.interval)
+        password_pool.run = original_run
+        results["pool"] = await run_storm(client, args.logins, args.catalog_requests, args.interval)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--catalog-requests", type=int, default=200)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between catalog requests")
+    asyncio.run(main(parser.parse_args()))
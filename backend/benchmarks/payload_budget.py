@@ -0,0 +1,193 @@
+"""Payload-size budget for the list endpoints.
+
+    python -m benchmarks.payload_budget            # check against payload_budget.json
+    python -m benchmarks.payload_budget --update   # re-record the budget (+10% headroom)
+
+Seeds a fixed dataset, fetches every list endpoint uncompressed and records
+its raw, gzip and brotli sizes plus bytes per item, then fetches it again
+with gzip negotiated and records what CompressionMiddleware actually sent
+(`wire_bytes`). Exits non-zero when any size exceeds the budget, so a projection that starts shipping full
+descriptions or image variants shows up as a failure rather than a slow page.
+`measure` and `check` can be imported by tests as well.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from bson import ObjectId
+from benchmarks.common import load_app, app_client
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "payload_budget.json")
+HEADROOM = 1.10
+
+# (name, path, role)
+ENDPOINTS = [
+    ("products_all", "/api/products/all", None),
+    ("products_page", "/api/products/all?limit=50", None),
+    ("search", "/api/products/search?limit=24", None),
+    ("categories", "/api/category/all-categories", None),
+    ("cart", "/api/cart/get-cart", "user"),
+    ("wishlist", "/api/wishlist/", "user"),
+    ("orders", "/api/orders/all-orders?limit=50", "user"),
+    ("admin_orders", "/api/orders/all-users-orders?limit=50", "admin"),
+]
+
+USER_ID = ObjectId("65f000000000000000000001")
+ADMIN_ID = ObjectId("65f000000000000000000002")
+_EPOCH = datetime(2026, 1, 1)
+
+
+def _image(product: int, index: int) -> dict:
+    base = f"https://res.cloudinary.com/demo/image/upload/products/p{product:04d}_{index}"
+    return {
+        "url": f"{base}.jpg",
+        "public_id": f"products/p{product:04d}_{index}",
+        "width": 2400,
+        "height": 2400,
+        "variants": [
+            {"name": name, "format": fmt, "width": edge, "height": edge,
+             "url": f"{base}_{name}.{fmt}", "public_id": f"products/variants/p{product:04d}_{index}_{name}_{fmt}"}
+            for name, edge in (("thumbnail", 200), ("card", 600), ("detail", 1600))
+            for fmt in ("webp", "avif")
+        ],
+    }
+
+
+async def seed(db, products: int = 120):
+    """A small, fixed catalog with one shopper's cart, wishlist and order history."""
+    for name in ("products", "categories", "cart_items", "wishlist", "orders"):
+        await db[name].delete_many({})
+
+    categories = [
+        {"_id": ObjectId(f"66{i:022x}"), "name": name, "slug": name.lower(), "image": f"https://cdn.example.com/{name}.jpg"}
+        for i, name in enumerate(["Rings", "Necklaces", "Earrings", "Bracelets", "Pendants", "Anklets"])
+    ]
+    await db.categories.insert_many(categories)
+
+    docs = []
+    for i in range(products):
+        images = [_image(i, n) for n in range(3)]
+        docs.append({
+            "_id": ObjectId(f"67{i:022x}"),
+            "name": f"Handcrafted {categories[i % 6]['name'][:-1]} No. {i}",
+            "price": 100 + (i * 37) % 4000,
+            "category": str(categories[i % 6]["_id"]),
+            "description": "Polished by hand in solid gold with a brilliant-cut centre stone. " * 4,
+            "shortDescription": "Solid gold, brilliant-cut centre stone.",
+            "sku": f"SMF-{i:05d}",
+            "stock": (i * 7) % 25,
+            "weight": "4.2 g",
+            "dimensions": "18 x 6 mm",
+            "featured": i % 10 == 0,
+            "images": [img["url"] for img in images],
+            "image_variants": images,
+            "thumbnail": images[0]["variants"][0]["url"],
+            "created_at": _EPOCH + timedelta(minutes=i),
+        })
+    await db.products.insert_many(docs)
+
+    await db.cart_items.insert_many([
+        {"user_id": USER_ID, "product_id": docs[i]["_id"], "quantity": 1 + i % 3} for i in range(10)
+    ])
+    await db.wishlist.insert_many([
+        {"user_id": USER_ID, "product_id": docs[i]["_id"], "created_at": _EPOCH + timedelta(hours=i)} for i in range(20)
+    ])
+    await db.orders.insert_many([
+        {
+            "user_id": USER_ID,
+            "items": [
+                {"product_id": str(docs[(i + n) % products]["_id"]), "name": docs[(i + n) % products]["name"],
+                 "quantity": 1, "price": docs[(i + n) % products]["price"]}
+                for n in range(3)
+            ],
+            "total_price": 1234.0,
+            "shipping_address": "221B Baker Street, London",
+            "status": "Pending",
+            "created_at": _EPOCH + timedelta(days=i),
+        }
+        for i in range(30)
+    ])
+
+
+async def _wire_bytes(client, path: str, headers: dict) -> int:
+    """Bytes on the wire with gzip negotiated, i.e. after CompressionMiddleware."""
+    async with client.stream("GET", path, headers={**headers, "Accept-Encoding": "gzip"}) as response:
+        response.raise_for_status()
+        return sum([len(chunk) async for chunk in response.aiter_raw()])
+
+
+async def measure(client, headers_by_role: dict, endpoints=ENDPOINTS) -> dict:
+    """Raw, offline-compressed and on-the-wire byte sizes per endpoint."""
+    from core.compression import brotli, compress
+
+    report = {}
+    for name, path, role in endpoints:
+        headers = {"Accept-Encoding": "identity", **headers_by_role.get(role, {})}
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        body = response.content
+        data = response.json()
+        items = data if isinstance(data, list) else data.get("results", [])
+        report[name] = {
+            "items": len(items),
+            "raw_bytes": len(body),
+            "gzip_bytes": len(compress(body, "gzip")),
+            "br_bytes": len(compress(body, "br")) if brotli is not None else None,
+            "wire_bytes": await _wire_bytes(client, path, headers_by_role.get(role, {})),
+            "bytes_per_item": len(body) // len(items) if items else None,
+        }
+    return report
+
+
+def check(report: dict, budget: dict) -> list:
+    """Every (endpoint, metric, size, limit) over budget."""
+    violations = []
+    for name, sizes in report.items():
+        for metric, limit in budget.get(name, {}).items():
+            size = sizes.get(metric)
+            if size is not None and limit is not None and size > limit:
+                violations.append((name, metric, size, limit))
+    return violations
+
+
+async def main(args):
+    load_app()
+    from main import app
+    from core.database import db
+    from core.jwt_handler import create_access_token
+
+    await seed(db)
+    headers_by_role = {
+        role: {"Authorization": "Bearer " + create_access_token({"id": str(uid), "email": f"{role}@example.com", "role": role})}
+        for role, uid in (("user", USER_ID), ("admin", ADMIN_ID))
+    }
+    async with app_client(app) as client:
+        report = await measure(client, headers_by_role)
+    print(json.dumps(report, indent=2))
+
+    if args.update:
+        budget = {
+            name: {metric: int(sizes[metric] * HEADROOM) for metric in ("raw_bytes", "gzip_bytes", "wire_bytes")}
+            for name, sizes in report.items()
+        }
+        with open(args.budget, "w") as f:
+            json.dump(budget, f, indent=2)
+            f.write("\n")
+        print(f"Budget written to {args.budget}")
+        return 0
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+    violations = check(report, budget)
+    for name, metric, size, limit in violations:
+        print(f"OVER BUDGET {name}.{metric}: {size} > {limit}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    parser.add_argument("--update", action="store_true")
+    sys.exit(asyncio.run(main(parser.parse_args())))
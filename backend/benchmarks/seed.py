@@ -0,0 +1,285 @@
+"""Deterministic synthetic dataset for scale testing.
+
+    python -m benchmarks.seed --products 100000 --orders 1000000 --drop
+    python -m benchmarks.seed --products 2000 --users 500 --orders 5000 --seed 7 --drop
+
+Fills categories, products, users, cart_items, wishlist, orders and
+blacklisted_tokens with documents shaped like the ones the app writes.
+Product popularity follows a Zipf-like curve (--skew), so a few products
+dominate carts, wishlists and order lines the way bestsellers do. The same
+--seed always yields the same documents, ids included; the one exception is
+the revoked tokens' timestamps, which are relative to the run so the TTL
+index doesn't drop them on arrival. Every seeded user can log in with
+SEED_PASSWORD.
+
+Target collections must be empty unless --drop is given; the database is
+MONGO_DB_NAME (smf_jewels_bench by default), see benchmarks/common.py.
+"""
+import argparse
+import asyncio
+import bisect
+import calendar
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from benchmarks.common import load_app
+
+load_app()
+
+from core.database import db
+from core.indexes import ensure_indexes
+from controllers.auth_controller import pwd_context
+
+SEED_PASSWORD = "seed-password"
+START = datetime(2024, 1, 1)
+SPAN_DAYS = 730
+ORDER_STATUSES = ["Pending", "Processing", "Shipped", "Delivered", "Cancelled"]
+ORDER_STATUS_WEIGHTS = [10, 10, 15, 60, 5]
+CATEGORY_NAMES = [
+    "Rings", "Necklaces", "Earrings", "Bracelets", "Pendants", "Anklets", "Bangles",
+    "Chains", "Nose Pins", "Mangalsutra", "Brooches", "Cufflinks",
+]
+METALS = ["Gold", "Rose Gold", "White Gold", "Silver", "Platinum"]
+STONES = ["Diamond", "Ruby", "Emerald", "Sapphire", "Pearl", "Topaz", "Amethyst", "Kundan"]
+STYLES = ["Classic", "Vintage", "Minimal", "Bridal", "Temple", "Floral", "Halo", "Solitaire"]
+COLLECTIONS = ["categories", "products", "users", "cart_items", "wishlist", "orders", "blacklisted_tokens"]
+
+
+def make_ids(tag: int, start: datetime, span: timedelta, count: int, rng: random.Random):
+    """`count` unique ObjectIds with timestamps inside [start, start + span), in creation order."""
+    seconds = sorted(rng.random() * span.total_seconds() for _ in range(count))
+    base = calendar.timegm(start.timetuple())
+    return [ObjectId(f"{base + int(s):08x}{tag:06x}{n:010x}") for n, s in enumerate(seconds)]
+
+
+def object_id(tag: int, n: int, at: datetime = START) -> ObjectId:
+    """The n-th id of a collection, stamped with `at`; never left to the driver."""
+    return ObjectId(f"{calendar.timegm(at.timetuple()):08x}{tag:06x}{n:010x}")
+
+
+def created_at(oid: ObjectId) -> datetime:
+    # Mongo stores milliseconds; whole seconds keep the docs identical on every run
+    return oid.generation_time.replace(tzinfo=None)
+
+
+class Popularity:
+    """Zipf-like sampler: rank r is picked with weight 1 / r**skew."""
+
+    def __init__(self, items: list, skew: float, rng: random.Random):
+        self.items = list(items)
+        rng.shuffle(self.items)  # bestsellers are spread over the catalog, not the oldest ids
+        self.cumulative = list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, len(self.items) + 1)))
+
+    def pick(self, rng: random.Random):
+        index = bisect.bisect(self.cumulative, rng.random() * self.cumulative[-1])
+        return self.items[min(index, len(self.items) - 1)]
+
+    def pick_distinct(self, rng: random.Random, count: int) -> list:
+        count = min(count, len(self.items))
+        chosen = {}
+        while len(chosen) < count:
+            chosen.setdefault(self.pick(rng))
+        return list(chosen)
+
+
+def categories(rng: random.Random, count: int):
+    ids = make_ids(1, START, timedelta(days=1), count, rng)
+    for i, oid in enumerate(ids):
+        name = CATEGORY_NAMES[i % len(CATEGORY_NAMES)] + ("" if i < len(CATEGORY_NAMES) else f" {i // len(CATEGORY_NAMES) + 1}")
+        yield {"_id": oid, "name": name, "slug": name.lower().replace(" ", "-"), "image": None}
+
+
+def _images(oid: ObjectId, rng: random.Random) -> dict:
+    base = f"https://res.cloudinary.com/smf/image/upload/products/{oid}"
+    records = []
+    for n in range(rng.randint(1, 4)):
+        variants = [
+            {"name": name, "format": fmt, "width": edge, "height": edge,
+             "url": f"{base}_{n}_{name}.{fmt}", "public_id": f"products/variants/{oid}_{n}_{name}_{fmt}"}
+            for name, edge in (("thumbnail", 200), ("card", 600), ("detail", 1600))
+            for fmt in ("webp", "avif")
+        ]
+        records.append({"url": f"{base}_{n}.jpg", "public_id": f"products/{oid}_{n}",
+                        "width": 2400, "height": 2400, "variants": variants})
+    return {
+        "images": [r["url"] for r in records],
+        "image_variants": records,
+        "thumbnail": records[0]["variants"][0]["url"],
+    }
+
+
+def products(rng: random.Random, ids: list, category_ids: list):
+    for i, oid in enumerate(ids):
+        category = rng.choice(category_ids)
+        metal, stone, style = rng.choice(METALS), rng.choice(STONES), rng.choice(STYLES)
+        name = f"{style} {metal} {stone} {rng.choice(CATEGORY_NAMES)[:-1]}"
+        price = round(rng.lognormvariate(7, 0.9), 2)
+        yield {
+            "_id": oid,
+            "name": name,
+            "price": price,
+            "category": str(category),
+            "description": (
+                f"A {style.lower()} piece in {metal.lower()}, set with a hand-selected {stone.lower()}. "
+                f"Finished by our artisans and made to be worn every day or saved for the moments that matter."
+            ),
+            "shortDescription": f"{metal} with {stone.lower()}, {style.lower()} design.",
+            "sku": f"SMF-{i:07d}",
+            "stock": rng.choice([0, 0, 1, 2, 3, 5, 8, 12, 20, 50]),
+            "weight": f"{rng.uniform(1, 40):.1f} g",
+            "dimensions": f"{rng.randint(5, 60)} x {rng.randint(2, 20)} mm",
+            "featured": rng.random() < 0.05,
+            **_images(oid, rng),
+            "created_at": created_at(oid),
+        }
+
+
+def users(rng: random.Random, ids: list, password_hash: str):
+    for i, oid in enumerate(ids):
+        yield {
+            "_id": oid,
+            "name": f"Shopper {i}",
+            "email": f"shopper{i}@example.com",
+            "password": password_hash,
+            "role": "admin" if i == 0 else "user",
+            "created_at": created_at(oid),
+        }
+
+
+def cart_items(rng: random.Random, user_ids: list, popularity: Popularity, share: float):
+    n = itertools.count()
+    for user_id in user_ids:
+        if rng.random() >= share:
+            continue
+        for product_id, _, _ in popularity.pick_distinct(rng, rng.randint(1, 6)):
+            yield {"_id": object_id(5, next(n)), "user_id": user_id, "product_id": product_id,
+                   "quantity": rng.choice([1, 1, 1, 2, 3])}
+
+
+def wishlist(rng: random.Random, user_ids: list, popularity: Popularity, share: float):
+    n = itertools.count()
+    for user_id in user_ids:
+        if rng.random() >= share:
+            continue
+        for product_id, _, _ in popularity.pick_distinct(rng, rng.randint(1, 12)):
+            added = START + timedelta(seconds=rng.randrange(SPAN_DAYS * 86400))
+            yield {"_id": object_id(6, next(n), added), "user_id": user_id, "product_id": product_id,
+                   "created_at": added}
+
+
+def orders(rng: random.Random, ids: list, buyers: Popularity, popularity: Popularity):
+    for oid in ids:
+        items = [
+            {"product_id": str(product_id), "name": name, "quantity": rng.choice([1, 1, 1, 2]), "price": price}
+            for product_id, name, price in popularity.pick_distinct(rng, rng.choice([1, 1, 1, 2, 2, 3, 4]))
+        ]
+        yield {
+            "_id": oid,
+            "user_id": buyers.pick(rng),
+            "items": items,
+            "total_price": round(sum(i["price"] * i["quantity"] for i in items), 2),
+            "shipping_address": f"{rng.randint(1, 999)} Market Road, Block {rng.randint(1, 40)}, Chennai",
+            "status": rng.choices(ORDER_STATUSES, ORDER_STATUS_WEIGHTS)[0],
+            "created_at": created_at(oid),
+        }
+
+
+def revoked_tokens(rng: random.Random, count: int, now: datetime):
+    for n in range(count):
+        revoked_at = now - timedelta(seconds=rng.random() * 3600)
+        yield {
+            "_id": object_id(7, n),
+            "jti": "%032x" % rng.getrandbits(128),
+            "expires_at": revoked_at + timedelta(hours=1),
+            "revoked_at": revoked_at,
+        }
+
+
+async def insert(collection: str, docs, batch_size: int) -> dict:
+    start = time.perf_counter()
+    total = 0
+    while True:
+        batch = list(itertools.islice(docs, batch_size))
+        if not batch:
+            break
+        await db[collection].insert_many(batch, ordered=False)
+        total += len(batch)
+    elapsed = time.perf_counter() - start
+    return {"count": total, "seconds": round(elapsed, 2), "docs_per_s": round(total / elapsed) if elapsed else total}
+
+
+async def main(args):
+    existing = {name: await db[name].estimated_document_count() for name in COLLECTIONS}
+    if any(existing.values()):
+        if not args.drop:
+            raise SystemExit(f"Target collections are not empty {existing}; pass --drop to replace them")
+        for name in COLLECTIONS:
+            await db[name].drop()
+
+    # One generator per collection, each derived from the seed, so changing one
+    # volume doesn't reshuffle every other collection
+    def rng_for(name):
+        return random.Random(f"{args.seed}:{name}")
+
+    category_ids = [c["_id"] for c in categories(rng_for("categories"), args.categories)]
+    product_ids = make_ids(2, START, timedelta(days=SPAN_DAYS), args.products, rng_for("product_ids"))
+    user_ids = make_ids(3, START, timedelta(days=SPAN_DAYS), args.users, rng_for("user_ids"))
+    order_ids = make_ids(4, START, timedelta(days=SPAN_DAYS), args.orders, rng_for("order_ids"))
+
+    report = {}
+    report["categories"] = await insert("categories", categories(rng_for("categories"), args.categories), args.batch_size)
+
+    # Keep only what orders need to copy (id, name, price) while products stream in
+    catalog = []
+
+    def remember(docs):
+        for doc in docs:
+            catalog.append((doc["_id"], doc["name"], doc["price"]))
+            yield doc
+
+    report["products"] = await insert(
+        "products", remember(products(rng_for("products"), product_ids, category_ids)), args.batch_size
+    )
+    popularity = Popularity(catalog, args.skew, rng_for("popularity"))
+    # Repeat customers: a minority of users place most orders
+    buyers = Popularity(user_ids, args.skew / 2, rng_for("buyers"))
+
+    password_hash = pwd_context.hash(SEED_PASSWORD)
+    report["users"] = await insert("users", users(rng_for("users"), user_ids, password_hash), args.batch_size)
+    report["cart_items"] = await insert(
+        "cart_items", cart_items(rng_for("cart_items"), user_ids, popularity, args.cart_share), args.batch_size
+    )
+    report["wishlist"] = await insert(
+        "wishlist", wishlist(rng_for("wishlist"), user_ids, popularity, args.wishlist_share), args.batch_size
+    )
+    report["orders"] = await insert(
+        "orders", orders(rng_for("orders"), order_ids, buyers, popularity), args.batch_size
+    )
+    report["blacklisted_tokens"] = await insert(
+        "blacklisted_tokens", revoked_tokens(rng_for("tokens"), args.revoked_tokens, datetime.utcnow()), args.batch_size
+    )
+
+    # Building indexes once over the full data is faster than maintaining them per insert
+    start = time.perf_counter()
+    index_report = await ensure_indexes()
+    report["indexes"] = {"seconds": round(time.perf_counter() - start, 2), "errors": index_report["errors"]}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--revoked-tokens", type=int, default=1000)
+    parser.add_argument("--cart-share", type=float, default=0.3, help="fraction of users with a cart")
+    parser.add_argument("--wishlist-share", type=float, default=0.2, help="fraction of users with a wishlist")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for product popularity")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop", action="store_true", help="drop non-empty target collections first")
+    asyncio.run(main(parser.parse_args()))
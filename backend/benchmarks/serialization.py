@@ -0,0 +1,100 @@
+"""Serialization cost of a synthetic catalog, FastAPI default vs core.responses.
+
+    python -m benchmarks.serialization --products 10000 --rounds 5
+
+No database needed: documents are built in memory in the shape
+product_helper returns.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from core.responses import dumps, _json_array
+from models.product_model import product_helper
+from schemas.product_schema import ProductResponse
+
+
+def synthetic_catalog(count: int) -> list:
+    category = {"_id": ObjectId(), "name": "Rings", "slug": "rings"}
+    base = datetime(2024, 1, 1)
+    return [
+        product_helper({
+            "_id": ObjectId(),
+            "name": f"Solitaire Ring {i}",
+            "price": 199.0 + i % 500,
+            "category": category,
+            "description": "Hand-set diamond on an 18k gold band. " * 4,
+            "shortDescription": "Hand-set diamond ring",
+            "sku": f"RING-{i:06d}",
+            "stock": i % 25,
+            "weight": "3.2g",
+            "dimensions": "18mm",
+            "featured": i % 10 == 0,
+            "images": [f"https://res.cloudinary.com/demo/image/upload/products/{i}-{n}.jpg" for n in range(3)],
+            "created_at": base + timedelta(minutes=i),
+        })
+        for i in range(count)
+    ]
+
+
+def fastapi_default(products):
+    # What a response_model route does: validate, encode, then stdlib json
+    validated = TypeAdapter(List[ProductResponse]).validate_python(products)
+    encoded = jsonable_encoder(validated)
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fastapi_untyped(products):
+    # A route without response_model still goes through jsonable_encoder
+    encoded = jsonable_encoder(products)
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fast_response(products):
+    return dumps(products)
+
+
+def streamed(products):
+    async def source():
+        for p in products:
+            yield p
+
+    async def collect():
+        return b"".join([chunk async for chunk in _json_array(source())])
+
+    return asyncio.run(collect())
+
+
+def best_of(fn, products, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        body = fn(products)
+        timings.append(time.perf_counter() - start)
+    return {"best_ms": round(min(timings) * 1000, 1), "bytes": len(body)}
+
+
+def main(args):
+    products = synthetic_catalog(args.products)
+    results = {
+        name: best_of(fn, products, args.rounds)
+        for name, fn in [
+            ("fastapi_response_model", fastapi_default),
+            ("fastapi_jsonable_encoder", fastapi_untyped),
+            ("fast_json_response", fast_response),
+            ("streamed_array", streamed),
+        ]
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    main(parser.parse_args())
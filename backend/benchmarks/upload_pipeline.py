@@ -0,0 +1,68 @@
+"""Offline comparison of sequential vs pooled image uploads.
+
+    python -m benchmarks.upload_pipeline --images 5 --latency 0.2
+
+Uses the local upload backend with an artificial per-upload delay and
+reports wall time plus the worst event-loop stall seen while uploading.
+"""
+import argparse
+import asyncio
+import io
+import json
+import tempfile
+import time
+from starlette.datastructures import UploadFile
+from core.image_variants import NoVariantGenerator
+from core.upload_service import LocalBackend, UploadService
+
+
+def make_files(count: int, size: int):
+    return [UploadFile(io.BytesIO(b"\0" * size), filename=f"img{i}.jpg", size=size) for i in range(count)]
+
+
+async def measure(upload):
+    # A ticker that should fire every 5ms; any larger gap is time the loop was blocked
+    stall = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.005)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await upload()
+    elapsed = time.perf_counter() - start
+    running = False
+    await tick
+    return {"wall_ms": round(elapsed * 1000, 1), "max_loop_stall_ms": round(stall * 1000, 1)}
+
+
+async def main(args):
+    backend = LocalBackend(root=tempfile.mkdtemp(), latency=args.latency)
+    # The payloads aren't real images, so only the originals are stored
+    service = UploadService(backend, NoVariantGenerator(), concurrency=args.concurrency)
+
+    async def sequential():
+        for f in make_files(args.images, args.size):
+            backend.upload(await f.read(), "products", f.filename)
+
+    async def pooled():
+        await service.upload_many(make_files(args.images, args.size), "products")
+
+    results = {"sequential": await measure(sequential), "upload_service": await measure(pooled)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=5)
+    parser.add_argument("--size", type=int, default=512 * 1024)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
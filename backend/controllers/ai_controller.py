@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import os
+from datetime import datetime
+from core.database import db
+from core.ai_client import get_ai_client
+from core.cpu_pool import CPUPool
+
+# Bump when the prompt changes so old cached descriptions stop matching
+PROMPT_VERSION = "v1"
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "30"))
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "4"))
+AI_MAX_QUEUE = int(os.getenv("AI_MAX_QUEUE", "32"))
+
+
+def build_prompt(product_name: str, category: str) -> str:
+    return (
+        f"Write a compelling and elegant product description for a {category} product "
+        f"named '{product_name}' that will be used in an eCommerce website. "
+        "Keep it within 2-4 sentences and use persuasive language."
+    )
+
+
+def cache_key(product_name: str, category: str) -> str:
+    normalized = f"{PROMPT_VERSION}|{category.strip().lower()}|{product_name.strip().lower()}"
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+class DescriptionService:
+    """Generates product descriptions with a persistent cache and single-flight.
+
+    Results are stored in `ai_descriptions` keyed by (name, category, prompt
+    version). Identical requests that arrive while a generation is running
+    wait on the same upstream call instead of starting their own.
+    """
+
+    def __init__(self, client, timeout: float = AI_TIMEOUT):
+        self.client = client
+        self.timeout = timeout
+        self.pool = CPUPool("ai", AI_MAX_CONCURRENCY, AI_MAX_QUEUE)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight = {}
+
+    async def _generate(self, key: str, product_name: str, category: str, throttle=None) -> str:
+        prompt = build_prompt(product_name, category)
+        if throttle is not None:
+            await throttle()
+        # The request stops waiting after the timeout; the pool keeps counting the thread until it returns
+        description = await self.pool.run(self.client.generate, prompt, timeout=self.timeout)
+        await db.ai_descriptions.update_one(
+            {"_id": key},
+            {"$set": {
+                "product_name": product_name,
+                "category": category,
+                "prompt_version": PROMPT_VERSION,
+                "description": description,
+                "created_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+        return description
+
+    async def generate(self, product_name: str, category: str, refresh: bool = False, throttle=None):
+        """Return (description, cached).
+
+        `refresh` skips the stored description and asks the model again;
+        `throttle` is awaited only right before an actual model call.
+        """
+        key = cache_key(product_name, category)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight), False
+
+        cached = None if refresh else await db.ai_descriptions.find_one({"_id": key}, {"description": 1})
+        if cached:
+            self.hits += 1
+            return cached["description"], True
+
+        # Re-check: another request may have started while we read the cache
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight), False
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._generate(key, product_name, category, throttle))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), False
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
+
+
+description_service = DescriptionService(get_ai_client())
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import UpdateOne
+from core.database import db
+from core.category_cache import category_cache
+from core.catalog_version import catalog_version
+from controllers.ai_controller import description_service
+
+AI_JOB_CONCURRENCY = int(os.getenv("AI_JOB_CONCURRENCY", "4"))
+AI_JOB_RATE = float(os.getenv("AI_JOB_RATE", "2"))  # upstream requests per second
+AI_JOB_MAX_RETRIES = int(os.getenv("AI_JOB_MAX_RETRIES", "3"))
+AI_JOB_BACKOFF = float(os.getenv("AI_JOB_BACKOFF", "1"))
+AI_JOB_WRITE_BATCH = int(os.getenv("AI_JOB_WRITE_BATCH", "50"))
+# A running job records progress at least this often (seconds)...
+AI_JOB_HEARTBEAT = float(os.getenv("AI_JOB_HEARTBEAT", "30"))
+# ...so one silent for this long belongs to a worker that stopped
+AI_JOB_STALE_AFTER = float(os.getenv("AI_JOB_STALE_AFTER", "300"))
+MAX_RECORDED_ERRORS = 50
+
+# Keep references so running jobs aren't garbage collected
+_running = {}
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def job_filter(spec: dict) -> dict:
+    query = {}
+    if spec.get("product_ids"):
+        query["_id"] = {"$in": [ObjectId(pid) for pid in spec["product_ids"] if ObjectId.is_valid(pid)]}
+    if spec.get("category"):
+        query["category"] = spec["category"]
+    if not spec.get("overwrite"):
+        empty = [{"description": {"$in": ["", None]}}, {"description": {"$exists": False}}]
+        if spec.get("include_short_description"):
+            empty += [{"shortDescription": {"$in": ["", None]}}, {"shortDescription": {"$exists": False}}]
+        query["$or"] = empty
+    return query
+
+
+def job_helper(job) -> dict:
+    started = job.get("started_at")
+    finished = job.get("finished_at") or datetime.utcnow()
+    elapsed = (finished - started).total_seconds() if started else 0
+    return {
+        "id": str(job["_id"]),
+        "status": job["status"],
+        "filter": job["filter"],
+        "total": job.get("total", 0),
+        "processed": job.get("processed", 0),
+        "succeeded": job.get("succeeded", 0),
+        "failed": job.get("failed", 0),
+        "throughput_per_min": round(job.get("processed", 0) / elapsed * 60, 1) if elapsed else 0.0,
+        "errors": job.get("errors", []),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "started_at": started,
+        "finished_at": job.get("finished_at"),
+    }
+
+
+def _short_description(description: str) -> str:
+    first_sentence = description.split(". ")[0].strip()
+    return first_sentence if first_sentence.endswith(".") else first_sentence + "."
+
+
+class _JobRun:
+    def __init__(self, job_id, spec):
+        self.job_id = job_id
+        self.spec = spec
+        self.limiter = RateLimiter(AI_JOB_RATE)
+        self.pending_writes = []
+        self.counts = {"processed": 0, "succeeded": 0, "failed": 0}
+        self.errors = []
+        self.flushed_at = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+
+    async def _generate(self, name: str, category: str) -> str:
+        for attempt in range(AI_JOB_MAX_RETRIES + 1):
+            try:
+                # Cached descriptions come back at once; only real model calls wait on the limiter
+                description, _ = await description_service.generate(
+                    name, category, refresh=bool(self.spec.get("overwrite")), throttle=self.limiter.wait,
+                )
+                return description
+            except Exception:
+                if attempt == AI_JOB_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(AI_JOB_BACKOFF * 2 ** attempt)
+
+    async def process(self, product):
+        try:
+            category = await category_cache.get_by_id(product.get("category")) if product.get("category") else None
+            description = await self._generate(product["name"], category["name"] if category else "jewelry")
+
+            update = {}
+            if self.spec.get("overwrite") or not product.get("description"):
+                update["description"] = description
+            if self.spec.get("include_short_description") and (self.spec.get("overwrite") or not product.get("shortDescription")):
+                update["shortDescription"] = _short_description(description)
+            if update:
+                self.pending_writes.append(UpdateOne({"_id": product["_id"]}, {"$set": update}))
+            self.counts["succeeded"] += 1
+        except Exception as e:
+            self.counts["failed"] += 1
+            if len(self.errors) < MAX_RECORDED_ERRORS:
+                self.errors.append({"product_id": str(product["_id"]), "error": str(e) or type(e).__name__})
+        self.counts["processed"] += 1
+
+        if len(self.pending_writes) >= AI_JOB_WRITE_BATCH or time.monotonic() - self.flushed_at >= AI_JOB_HEARTBEAT:
+            await self.flush()
+
+    async def flush(self):
+        async with self._flush_lock:
+            writes, self.pending_writes = self.pending_writes, []
+            self.flushed_at = time.monotonic()
+            if writes:
+                await db.products.bulk_write(writes, ordered=False)
+            await db.ai_jobs.update_one(
+                {"_id": self.job_id},
+                {"$set": {**self.counts, "errors": self.errors, "heartbeat_at": datetime.utcnow()}}
+            )
+
+
+async def _run_job(job_id: ObjectId, spec: dict):
+    run = _JobRun(job_id, spec)
+    query = job_filter(spec)
+    try:
+        total = await db.products.count_documents(query)
+        await db.ai_jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "running", "total": total, "started_at": datetime.utcnow(), "heartbeat_at": datetime.utcnow()}}
+        )
+
+        semaphore = asyncio.Semaphore(AI_JOB_CONCURRENCY)
+        tasks = set()
+
+        async def worker(product):
+            try:
+                await run.process(product)
+            finally:
+                semaphore.release()
+
+        projection = {"name": 1, "category": 1, "description": 1, "shortDescription": 1}
+        # Walk by _id so products updated mid-job are never revisited
+        async for product in db.products.find(query, projection).sort("_id", 1):
+            await semaphore.acquire()
+            task = asyncio.create_task(worker(product))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+        await run.flush()
+        await db.ai_jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "completed", "finished_at": datetime.utcnow()}}
+        )
+    except Exception as e:
+        await run.flush()
+        await db.ai_jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "finished_at": datetime.utcnow(), "error": str(e)}}
+        )
+    finally:
+        _running.pop(job_id, None)
+        if run.counts["succeeded"]:
+            await catalog_version.bump()
+
+
+async def submit_job(spec: dict, user_id: str) -> dict:
+    job = {
+        "status": "queued",
+        "filter": spec,
+        "created_by": user_id,
+        "created_at": datetime.utcnow(),
+        "heartbeat_at": datetime.utcnow(),
+        "total": 0,
+        "processed": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "errors": [],
+    }
+    result = await db.ai_jobs.insert_one(job)
+    job["_id"] = result.inserted_id
+    _running[result.inserted_id] = asyncio.create_task(_run_job(result.inserted_id, spec))
+    return job_helper(job)
+
+
+async def fail_stale_jobs() -> int:
+    """Fail queued/running jobs whose worker stopped heartbeating, e.g. after a restart.
+
+    Runs at startup and before job reads; jobs running in this worker are left alone.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=AI_JOB_STALE_AFTER)
+    result = await db.ai_jobs.update_many(
+        {
+            "_id": {"$nin": list(_running)},
+            "status": {"$in": ["queued", "running"]},
+            "$or": [
+                {"heartbeat_at": {"$lt": cutoff}},
+                {"heartbeat_at": {"$exists": False}, "created_at": {"$lt": cutoff}},
+            ],
+        },
+        {"$set": {"status": "failed", "finished_at": datetime.utcnow(), "error": "Interrupted: the worker running this job stopped"}}
+    )
+    return result.modified_count
+
+
+async def get_job(job_id: str):
+    if not ObjectId.is_valid(job_id):
+        return None
+    await fail_stale_jobs()
+    job = await db.ai_jobs.find_one({"_id": ObjectId(job_id)})
+    return job_helper(job) if job else None
+
+
+async def list_jobs(limit: int = 20):
+    await fail_stale_jobs()
+    jobs = await db.ai_jobs.find().sort("_id", -1).limit(limit).to_list(length=None)
+    return [job_helper(j) for j in jobs]
@@ -1,8 +1,13 @@
 from passlib.context import CryptContext
 from datetime import datetime
 from models.user_model import user_helper
+from core.cpu_pool import password_pool
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# bcrypt takes 100ms+ per call, so both run on the password pool instead of the event loop
+async def hash_password(password: str) -> str:
+    return await password_pool.run(pwd_context.hash, password)
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await password_pool.run(pwd_context.verify, plain, hashed)
@@ -1,10 +1,43 @@
 from bson import ObjectId
+from pymongo import ReturnDocument
 from core.database import db
+from core.cart_cache import cart_cache, cart_totals, cart_version
 from models.cart_model import cart_item_helper
+from models.product_model import thumbnail_images
 from fastapi import HTTPException
 
+# Product fields carried on every cart line
+CART_PRODUCT_FIELDS = ["images", "thumbnail", "name", "price", "originalPrice", "image", "size", "stock"]
+
+def _cart_line(item, product) -> dict:
+    return {
+        "_id": str(item["_id"]),
+        "product_id": str(item["product_id"]),
+        "quantity": item["quantity"],
+        "product": thumbnail_images({
+            "_id": str(product["_id"]),
+            **{field: product[field] for field in CART_PRODUCT_FIELDS if field in product}
+        })
+    }
+
+async def cart_revision(user_id: str) -> int:
+    doc = await db.cart_revisions.find_one({"_id": ObjectId(user_id)})
+    return doc["revision"] if doc else 0
+
+async def bump_cart_revision(user_id: str) -> int:
+    """Count a write to this user's cart; every worker's cached copy checks against it."""
+    doc = await db.cart_revisions.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": {"revision": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["revision"]
+
 # In cart_controller.py
 async def get_user_cart(user_id: str):
+    # Read before the lines, so a write racing the aggregation can only make the entry look older
+    revision = await cart_revision(user_id)
     pipeline = [
         {
             "$match": {"user_id": ObjectId(user_id)}
@@ -25,13 +58,7 @@ async def get_user_cart(user_id: str):
                 "quantity": 1,
                 "product": {
                     "_id": "$product._id",
-                    "images": "$product.images",
-                    "name": "$product.name",
-                    "price": "$product.price",
-                    "originalPrice": "$product.originalPrice",
-                    "image": "$product.image",
-                    "size": "$product.size",
-                    "stock": "$product.stock",
+                    **{field: f"$product.{field}" for field in CART_PRODUCT_FIELDS}
                 }
             }
         }
@@ -42,69 +69,90 @@ async def get_user_cart(user_id: str):
     async for item in cart_items:
        item["_id"] = str(item["_id"])
        item["product_id"] = str(item["product_id"])
-       item["product"]["_id"] = str(item["product"]["_id"]) 
+       item["product"]["_id"] = str(item["product"]["_id"])
+       thumbnail_images(item["product"])
        result.append(item)
+    cart_cache.put(user_id, result, revision)
     return result
 
+async def cart_summary(user_id: str, item: dict = None, removed: str = None) -> dict:
+    # Totals come from the cached lines; only a cold cache costs the full aggregation
+    lines = cart_cache.get(user_id)
+    if lines is None:
+        await get_user_cart(user_id)
+        lines = cart_cache.get(user_id) or {}
+    lines = list(lines.values())
+    return {
+        "item": item,
+        "removed": removed,
+        "totals": cart_totals(lines),
+        "version": cart_version(lines)
+    }
+
+async def _cart_product(product_id: str):
+    # Always the live product: the stock check can't trust a cached line
+    return await db.products.find_one(
+        {"_id": ObjectId(product_id)},
+        {field: 1 for field in CART_PRODUCT_FIELDS}
+    )
+
 async def add_to_cart(user_id: str, data: dict):
     product_id = data["product_id"]
     quantity = data["quantity"]
 
-    product = await db.products.find_one({"_id": ObjectId(product_id)})
+    product = await _cart_product(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     if quantity > product["stock"]:
         raise HTTPException(status_code=400, detail="Requested quantity exceeds available stock")
 
-    existing = await db.cart_items.find_one({
-        "user_id": ObjectId(user_id),
-        "product_id": ObjectId(product_id)
-    })
+    item = await db.cart_items.find_one_and_update(
+        {"user_id": ObjectId(user_id), "product_id": ObjectId(product_id)},
+        {"$inc": {"quantity": quantity}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
 
-    if existing:
-        new_quantity = existing["quantity"] + quantity
-        if new_quantity > product["stock"]:
-            raise HTTPException(status_code=400, detail="Total quantity exceeds available stock")
-
-        await db.cart_items.update_one(
-            {"_id": existing["_id"]},
-            {"$set": {"quantity": new_quantity}}
-        )
-    else:
-        await db.cart_items.insert_one({
-            "user_id": ObjectId(user_id),
-            "product_id": ObjectId(product_id),
-            "quantity": quantity
-        })
+    if item["quantity"] > product["stock"]:
+        # Undo the increment rather than paying for a read before every write
+        await db.cart_items.update_one({"_id": item["_id"]}, {"$inc": {"quantity": -quantity}})
+        raise HTTPException(status_code=400, detail="Total quantity exceeds available stock")
 
-    return {"message": "Item added to cart"}
+    line = _cart_line(item, product)
+    cart_cache.apply(user_id, await bump_cart_revision(user_id), line=line)
+    return line
 
 async def update_cart_item(user_id: str, product_id: str, quantity: int):
-    product = await db.products.find_one({"_id": ObjectId(product_id)})
+    product = await _cart_product(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     if quantity > product["stock"]:
         raise HTTPException(status_code=400, detail="Requested quantity exceeds available stock")
 
-    result = await db.cart_items.update_one(
+    item = await db.cart_items.find_one_and_update(
         {
             "user_id": ObjectId(user_id),
             "product_id": ObjectId(product_id)
         },
-        {"$set": {"quantity": quantity}}
+        {"$set": {"quantity": quantity}},
+        return_document=ReturnDocument.AFTER
     )
 
-    if result.modified_count == 0:
+    if not item:
         raise HTTPException(status_code=404, detail="Cart item not found")
 
-    return {"message": "Cart updated"}
+    line = _cart_line(item, product)
+    cart_cache.apply(user_id, await bump_cart_revision(user_id), line=line)
+    return line
 
 # Update all operations to use the same collection (e.g., cart_items)
 async def remove_from_cart(user_id: str, product_id: str):
-    await db.cart_items.delete_one({
+    deleted = await db.cart_items.delete_one({
         "user_id": ObjectId(user_id),
         "product_id": ObjectId(product_id)
     })
-    return {"msg": "Item removed"}
\ No newline at end of file
+    if deleted.deleted_count:
+        cart_cache.apply(user_id, await bump_cart_revision(user_id), removed=product_id)
+    return {"msg": "Item removed"}
@@ -0,0 +1,185 @@
+import asyncio
+import csv
+import io
+import os
+from datetime import datetime
+from itertools import islice
+import orjson
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from core.database import db
+from core.category_cache import category_cache
+from core.catalog_version import catalog_version
+from schemas.product_schema import ProductCreate, ProductImportRow
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 1000
+
+
+def _read_rows(file, fmt: str):
+    """Yield (line number, row dict or None, parse error) from a file object."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row, None
+        else:
+            for line_no, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    yield line_no, None, "Invalid JSON"
+                    continue
+                if isinstance(row, dict):
+                    yield line_no, row, None
+                else:
+                    yield line_no, None, "Expected a JSON object"
+    finally:
+        # Don't let the wrapper close the upload's file underneath FastAPI
+        text.detach()
+
+
+async def _resolve_category(value):
+    category = await category_cache.get_by_slug(value) or await category_cache.get_by_id(value)
+    if not category:
+        return None
+    return {"id": str(category["_id"]), "name": category["name"], "slug": category.get("slug")}
+
+
+async def _parse_row(raw: dict) -> tuple:
+    """(sku, the fields this row supplies) for one import row."""
+    # CSV leaves missing cells as "", which means "not supplied", not "blank it"
+    row = {k.strip(): v for k, v in raw.items() if k and v not in ("", None)}
+    if isinstance(row.get("images"), str):
+        row["images"] = [url.strip() for url in row["images"].split("|") if url.strip()]
+    if "category" in row:
+        category = await _resolve_category(str(row["category"]).strip())
+        if not category:
+            raise ValueError(f"Unknown category '{row['category']}'")
+        row["category"] = category
+
+    product = ProductImportRow(**row)
+    if not product.sku:
+        raise ValueError("sku is required for import")
+    return product.sku, product.dict(exclude_unset=True)
+
+
+def _operation(sku: str, provided: dict, exists: bool, now: datetime) -> UpdateOne:
+    fields = dict(provided)
+    if "category" in fields:
+        fields["category"] = fields["category"]["id"]
+    if exists:
+        # Existing products only get the fields the row supplies
+        return UpdateOne({"sku": sku}, {"$set": {**fields, "updated_at": now}})
+
+    # A new product must pass the full schema; its defaults fill what the row left out
+    product = ProductCreate(**{"category": None, **provided})
+    defaults = {k: v for k, v in product.dict().items() if k not in provided}
+    return UpdateOne(
+        {"sku": sku},
+        {"$set": {**fields, "updated_at": now}, "$setOnInsert": {**defaults, "created_at": now}},
+        upsert=True,
+    )
+
+
+class ImportReport:
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.errors_truncated = 0
+
+    def error(self, line: int, sku, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line, "sku": sku, "error": message})
+        else:
+            self.errors_truncated += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+
+async def _write_batch(batch: dict, report: ImportReport):
+    lines, operations = [], []
+    for sku, (line, op) in batch.items():
+        lines.append((line, sku))
+        operations.append(op)
+    try:
+        result = await db.products.bulk_write(operations, ordered=False)
+        details = result.bulk_api_result
+    except BulkWriteError as e:
+        details = e.details
+        for err in details.get("writeErrors", []):
+            line, sku = lines[err["index"]]
+            report.error(line, sku, err.get("errmsg", "Write failed"))
+    report.inserted += details.get("nUpserted", 0)
+    report.updated += details.get("nMatched", 0)
+
+
+async def import_products(file, fmt: str) -> dict:
+    """Upsert products by sku from a CSV or NDJSON file, one batch at a time."""
+    report = ImportReport()
+    rows = _read_rows(file, fmt)
+    now = datetime.utcnow()
+
+    while True:
+        # File reads happen off the event loop; only one batch is held in memory
+        chunk = await asyncio.to_thread(lambda: list(islice(rows, IMPORT_BATCH_SIZE)))
+        if not chunk:
+            break
+
+        rows_by_sku = {}
+        for line, raw, parse_error in chunk:
+            report.processed += 1
+            if parse_error:
+                report.error(line, None, parse_error)
+                continue
+            try:
+                sku, provided = await _parse_row(raw)
+            except ValidationError as e:
+                report.error(line, raw.get("sku") or None, _validation_message(e))
+                continue
+            except ValueError as e:
+                report.error(line, raw.get("sku") or None, str(e))
+                continue
+            # A sku repeated within one batch: later rows' fields win, as they would sequentially
+            _, earlier = rows_by_sku.pop(sku, (None, {}))
+            rows_by_sku[sku] = (line, {**earlier, **provided})
+
+        # One indexed read per batch tells partial updates from new products
+        existing = {
+            doc["sku"]
+            async for doc in db.products.find({"sku": {"$in": list(rows_by_sku)}}, {"sku": 1})
+        } if rows_by_sku else set()
+
+        batch = {}
+        for sku, (line, provided) in rows_by_sku.items():
+            try:
+                batch[sku] = (line, _operation(sku, provided, sku in existing, now))
+            except ValidationError as e:
+                report.error(line, sku, _validation_message(e))
+
+        if batch:
+            await _write_batch(batch, report)
+
+    if report.inserted or report.updated:
+        await catalog_version.bump()
+    return report.as_dict()
@@ -0,0 +1,151 @@
+import asyncio
+import os
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from core.database import db
+from core.catalog_version import catalog_version
+
+INVENTORY_MAX_BATCH = int(os.getenv("INVENTORY_MAX_BATCH", "5000"))
+# Guarded items in flight at once; each is its own round trip
+INVENTORY_CONCURRENCY = int(os.getenv("INVENTORY_CONCURRENCY", "16"))
+INVENTORY_FIELDS = {"stock": 1, "price": 1}
+
+
+def _item_ref(item) -> tuple:
+    if item.id:
+        return "id", item.id
+    return "sku", item.sku
+
+
+def _item_error(item) -> str:
+    field, ref = _item_ref(item)
+    if not ref:
+        return "id or sku is required"
+    if field == "id" and not ObjectId.is_valid(ref):
+        return "Invalid product id"
+    if item.stock is not None and item.stock_delta is not None:
+        return "Give stock or stock_delta, not both"
+    if item.stock is None and item.stock_delta is None and item.price is None:
+        return "Nothing to update"
+    if item.stock is not None and item.stock < 0:
+        return "stock can't be negative"
+    if item.price is not None and item.price < 0:
+        return "price can't be negative"
+    return None
+
+
+def _guarded(item) -> bool:
+    # Guarded changes may legitimately match nothing; the rest always match an existing product
+    return (
+        item.expected_stock is not None
+        or item.expected_price is not None
+        or (item.stock_delta is not None and item.stock_delta < 0)
+    )
+
+
+def _operation(item, product_id: ObjectId, now: datetime) -> tuple:
+    query = {"_id": product_id}
+    if item.expected_stock is not None:
+        query["stock"] = item.expected_stock
+    elif item.stock_delta is not None and item.stock_delta < 0:
+        query["stock"] = {"$gte": -item.stock_delta}
+    if item.expected_price is not None:
+        query["price"] = item.expected_price
+
+    update = {"$set": {"updated_at": now}}
+    if item.stock is not None:
+        update["$set"]["stock"] = item.stock
+    if item.stock_delta is not None:
+        update["$inc"] = {"stock": item.stock_delta}
+    if item.price is not None:
+        update["$set"]["price"] = item.price
+    return query, update
+
+
+async def _resolve(refs: list) -> dict:
+    """Map each ("id" | "sku", value) ref to its product _id, in one read."""
+    ids = [ObjectId(r) for f, r in refs if f == "id"]
+    skus = [r for f, r in refs if f == "sku"]
+    clauses = ([{"_id": {"$in": ids}}] if ids else []) + ([{"sku": {"$in": skus}}] if skus else [])
+    if not clauses:
+        return {}
+    resolved = {}
+    async for p in db.products.find({"$or": clauses}, {"sku": 1}):
+        resolved[("id", str(p["_id"]))] = p["_id"]
+        if p.get("sku"):
+            resolved[("sku", p["sku"])] = p["_id"]
+    return resolved
+
+
+async def _apply_guarded(query: dict, update: dict, semaphore: asyncio.Semaphore):
+    async with semaphore:
+        return await db.products.find_one_and_update(
+            query, update, projection=INVENTORY_FIELDS, return_document=ReturnDocument.AFTER
+        )
+
+
+async def sync_inventory(items: list) -> dict:
+    """Apply stock/price changes and report the outcome per item.
+
+    Items are resolved to product ids first. Unguarded changes go out as one
+    bulk_write; guarded ones (expected_* or a negative delta) each run as a
+    find_one_and_update, whose result says exactly whether the guard held.
+    Each item is "updated", "conflict" (a guard or the no-negative-stock rule
+    didn't hold), "not_found", "duplicate" or "invalid".
+    """
+    now = datetime.utcnow()
+    results = [None] * len(items)
+    valid = []
+
+    for i, item in enumerate(items):
+        error = _item_error(item)
+        if error:
+            results[i] = {"ref": _item_ref(item)[1], "status": "invalid", "error": error}
+        else:
+            valid.append(i)
+
+    resolved = await _resolve([_item_ref(items[i]) for i in valid])
+    bulk, guarded, seen = [], [], set()
+    for i in valid:
+        item = items[i]
+        ref = _item_ref(item)[1]
+        product_id = resolved.get(_item_ref(item))
+        if product_id is None:
+            results[i] = {"ref": ref, "status": "not_found"}
+        elif product_id in seen:
+            # Two changes to one product (by id and by sku alike) have no defined order
+            results[i] = {"ref": ref, "status": "duplicate"}
+        else:
+            seen.add(product_id)
+            (guarded if _guarded(item) else bulk).append((i, product_id, _operation(item, product_id, now)))
+
+    if bulk:
+        await db.products.bulk_write([UpdateOne(q, u) for _, _, (q, u) in bulk], ordered=False)
+        found = await db.products.find(
+            {"_id": {"$in": [product_id for _, product_id, _ in bulk]}}, INVENTORY_FIELDS
+        ).to_list(length=None)
+        by_id = {p["_id"]: p for p in found}
+        for i, product_id, _ in bulk:
+            product = by_id.get(product_id)
+            ref = _item_ref(items[i])[1]
+            # Without a guard the update matches unless the product was deleted in between
+            if product is None:
+                results[i] = {"ref": ref, "status": "not_found"}
+            else:
+                results[i] = {"ref": ref, "status": "updated", "stock": product.get("stock"), "price": product.get("price")}
+
+    if guarded:
+        semaphore = asyncio.Semaphore(INVENTORY_CONCURRENCY)
+        applied = await asyncio.gather(*(_apply_guarded(q, u, semaphore) for _, _, (q, u) in guarded))
+        for (i, _, _), product in zip(guarded, applied):
+            ref = _item_ref(items[i])[1]
+            if product is None:
+                results[i] = {"ref": ref, "status": "conflict"}
+            else:
+                results[i] = {"ref": ref, "status": "updated", "stock": product.get("stock"), "price": product.get("price")}
+
+    updated = sum(1 for r in results if r["status"] == "updated")
+    if updated:
+        await catalog_version.bump()
+    return {"updated": updated, "failed": len(items) - updated, "results": results}
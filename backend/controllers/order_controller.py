@@ -1,38 +1,124 @@
 from bson import ObjectId
-from datetime import datetime
-from core.database import db
+from datetime import datetime, timedelta
+import csv
+import io
+import json
+from pymongo import UpdateOne
+from core.database import client, db
+from core.cart_cache import cart_cache
+from controllers.cart_controller import bump_cart_revision
+from models.order_model import order_helper
 
-async def place_order(user_id: str, shipping_address: str):
-    cart_items = await db.cart_items.find({"user_id": ObjectId(user_id)}).to_list(length=None)
+class CheckoutError(Exception):
+    pass
 
-    if not cart_items:
-        raise Exception("Your cart is empty.")
 
-    order_items = []
-    total_price = 0
+_transactions_supported = None
+
+async def _supports_transactions() -> bool:
+    # Multi-document transactions need a replica set or sharded cluster
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await client.admin.command("hello")
+            _transactions_supported = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception:
+            _transactions_supported = False
+    return _transactions_supported
 
+
+async def _load_checkout(user_id: str):
+    cart_items = await db.cart_items.find({"user_id": ObjectId(user_id)}).to_list(length=None)
+    if not cart_items:
+        raise CheckoutError("Your cart is empty.")
+
+    quantities = {}
     for item in cart_items:
-        product = await db.products.find_one({"_id": ObjectId(item["product_id"])})
-        if not product:
-            raise Exception("Product not found.")
-        if product["stock"] < item["quantity"]:
-            raise Exception(f"Not enough stock for {product['name']}")
+        product_id = ObjectId(item["product_id"])
+        quantities[product_id] = quantities.get(product_id, 0) + item["quantity"]
 
-        await db.products.update_one(
-            {"_id": ObjectId(item["product_id"])},
-            {"$inc": {"stock": -item["quantity"]}}
+    # One $in query for every product in the cart
+    products = {
+        p["_id"]: p
+        async for p in db.products.find(
+            {"_id": {"$in": list(quantities)}},
+            {"name": 1, "price": 1, "stock": 1},
         )
+    }
 
+    order_items = []
+    total_price = 0
+    for product_id, quantity in quantities.items():
+        product = products.get(product_id)
+        if not product:
+            raise CheckoutError("Product not found.")
+        if product.get("stock", 0) < quantity:
+            raise CheckoutError(f"Not enough stock for {product['name']}")
         order_items.append({
-            "product_id": str(item["product_id"]),
+            "product_id": str(product_id),
             "name": product["name"],
-            "quantity": item["quantity"],
+            "quantity": quantity,
             "price": product["price"]
         })
+        total_price += product["price"] * quantity
+
+    return quantities, order_items, total_price
+
+
+def _stock_updates(quantities: dict, marker=None):
+    # The stock >= qty guard makes each decrement fail instead of overselling
+    updates = []
+    for product_id, quantity in quantities.items():
+        update = {"$inc": {"stock": -quantity}}
+        if marker is not None:
+            update["$addToSet"] = {"pending_orders": marker}
+        updates.append(UpdateOne({"_id": product_id, "stock": {"$gte": quantity}}, update))
+    return updates
+
+
+async def _checkout_in_transaction(user_id, order, quantities):
+    async def callback(session):
+        result = await db.products.bulk_write(_stock_updates(quantities), ordered=False, session=session)
+        if result.modified_count != len(quantities):
+            raise CheckoutError("Not enough stock for one or more items in your cart")
+        await db.orders.insert_one(order, session=session)
+        await db.cart_items.delete_many({"user_id": ObjectId(user_id)}, session=session)
+
+    async with await client.start_session() as session:
+        await session.with_transaction(callback)
+
 
-        total_price += product["price"] * item["quantity"]
+async def _checkout_with_compensation(user_id, order, quantities):
+    # Without transactions, tag each decremented product with the order id so
+    # exactly those decrements can be reverted if anything later fails.
+    order_id = order["_id"]
+    result = await db.products.bulk_write(_stock_updates(quantities, marker=order_id), ordered=False)
+    try:
+        if result.modified_count != len(quantities):
+            raise CheckoutError("Not enough stock for one or more items in your cart")
+        await db.orders.insert_one(order)
+    except Exception:
+        await db.products.bulk_write([
+            UpdateOne(
+                {"_id": product_id, "pending_orders": order_id},
+                {"$inc": {"stock": quantity}, "$pull": {"pending_orders": order_id}},
+            )
+            for product_id, quantity in quantities.items()
+        ], ordered=False)
+        raise
+
+    await db.products.update_many(
+        {"_id": {"$in": list(quantities)}},
+        {"$pull": {"pending_orders": order_id}}
+    )
+    await db.cart_items.delete_many({"user_id": ObjectId(user_id)})
+
+
+async def place_order(user_id: str, shipping_address: str):
+    quantities, order_items, total_price = await _load_checkout(user_id)
 
     order = {
+        "_id": ObjectId(),
         "user_id": ObjectId(user_id),
         "items": order_items,
         "total_price": total_price,
@@ -41,26 +127,115 @@ async def place_order(user_id: str, shipping_address: str):
         "created_at": datetime.utcnow()
     }
 
-    result = await db.orders.insert_one(order)
-    await db.cart_items.delete_many({"user_id": ObjectId(user_id)})
+    if await _supports_transactions():
+        await _checkout_in_transaction(user_id, order, quantities)
+    else:
+        await _checkout_with_compensation(user_id, order, quantities)
+    await bump_cart_revision(user_id)
+    cart_cache.invalidate(user_id)
 
-    order["id"] = str(result.inserted_id)
+    order["id"] = str(order.pop("_id"))
     order["user_id"] = str(order["user_id"])
     return order
 
-async def get_user_orders(user_id: str):
-    orders = await db.orders.find({"user_id": ObjectId(user_id)}).to_list(length=None)
-    for o in orders:
-        o["id"] = str(o["_id"])
-        o["user_id"] = str(o["user_id"])
-    return orders
-
-async def get_all_orders():
-    orders = await db.orders.find().to_list(length=None)
-    for o in orders:
-        o["id"] = str(o["_id"])
-        o["user_id"] = str(o["user_id"])
-    return orders
+MAX_ORDER_PAGE_SIZE = 200
+EXPORT_BATCH_SIZE = 1000
+_EPOCH = datetime(1970, 1, 1)
+
+def _encode_cursor(order) -> str:
+    millis = (order["created_at"] - _EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}_{order['_id']}"
+
+def _decode_cursor(cursor: str):
+    try:
+        millis, order_id = cursor.split("_", 1)
+        return _EPOCH + timedelta(milliseconds=int(millis)), ObjectId(order_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def order_filter(user_id: str = None, status: str = None, date_from: datetime = None,
+                 date_to: datetime = None, after: str = None) -> dict:
+    query = {}
+    if user_id:
+        query["user_id"] = ObjectId(user_id)
+    if status:
+        query["status"] = status
+    if date_from or date_to:
+        query["created_at"] = {}
+        if date_from:
+            query["created_at"]["$gte"] = date_from
+        if date_to:
+            query["created_at"]["$lt"] = date_to
+    if after:
+        # Keyset on (created_at, _id) descending: strictly older, or same time with a smaller id
+        created_at, order_id = _decode_cursor(after)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": order_id}},
+        ]
+    return query
+
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+
+async def list_orders(limit: int = 50, after: str = None, **filters):
+    """Return (orders, next_cursor), newest first."""
+    limit = min(limit, MAX_ORDER_PAGE_SIZE)
+    cursor = db.orders.find(order_filter(after=after, **filters)).sort(NEWEST_FIRST).limit(limit + 1)
+    orders = await cursor.to_list(length=None)
+
+    next_cursor = None
+    if len(orders) > limit:
+        orders = orders[:limit]
+        next_cursor = _encode_cursor(orders[-1])
+
+    return [order_helper(o) for o in orders], next_cursor
+
+async def iter_orders(query: dict):
+    # Every matching order, newest first, formatted straight off the cursor for streamed responses
+    cursor = db.orders.find(query).sort(NEWEST_FIRST).batch_size(EXPORT_BATCH_SIZE)
+    async for order in cursor:
+        yield order_helper(order)
+
+async def get_user_orders(user_id: str, limit: int = 50, after: str = None):
+    return await list_orders(limit=limit, after=after, user_id=user_id)
+
+async def get_all_orders(limit: int = 50, after: str = None, **filters):
+    return await list_orders(limit=limit, after=after, **filters)
+
+def _export_row(order) -> dict:
+    return {
+        "id": str(order["_id"]),
+        "user_id": str(order["user_id"]),
+        "status": order.get("status"),
+        "total_price": order.get("total_price"),
+        "created_at": order["created_at"].isoformat() if order.get("created_at") else None,
+        "shipping_address": order.get("shipping_address"),
+        "items": order.get("items", []),
+    }
+
+CSV_COLUMNS = ["id", "user_id", "status", "total_price", "created_at", "shipping_address", "item_count", "items"]
+
+async def export_orders(fmt: str = "ndjson", **filters):
+    # Rows go straight from the cursor to the client, so memory stays flat however many orders match
+    cursor = db.orders.find(order_filter(**filters)).sort(NEWEST_FIRST).batch_size(EXPORT_BATCH_SIZE)
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        async for order in cursor:
+            row = _export_row(order)
+            writer.writerow([
+                row["id"], row["user_id"], row["status"], row["total_price"], row["created_at"],
+                row["shipping_address"], len(row["items"]),
+                "; ".join(f'{i.get("name")} x{i.get("quantity")}' for i in row["items"]),
+            ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    else:
+        async for order in cursor:
+            yield json.dumps(_export_row(order), default=str) + "\n"
 
 async def update_order_status(order_id: str, status: str):
     result = await db.orders.update_one(
@@ -1,14 +1,41 @@
-from core.database import db
+from core.database import db, catalog_db
+from core.category_cache import category_cache
+from core.catalog_version import catalog_version, catalog_session
 from bson import ObjectId
-from models.product_model import product_helper
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from models.product_model import product_helper, product_listing_helper
+from core.image_variants import thumbnail_url
 from datetime import datetime
 
+# Variant records live alongside `images`, in the same order
+def product_images(image_urls: list, records: list) -> dict:
+    by_url = {r["url"]: r for r in records}
+    ordered = [by_url[url] for url in image_urls if url in by_url]
+    first = by_url.get(image_urls[0]) if image_urls else None
+    return {
+        "images": image_urls,
+        "image_variants": ordered,
+        "thumbnail": thumbnail_url(first) if first else None,
+    }
+
+async def existing_image_records(product_id: str) -> list:
+    if not ObjectId.is_valid(product_id):
+        return []
+    product = await db.products.find_one({"_id": ObjectId(product_id)}, {"image_variants": 1})
+    return product.get("image_variants", []) if product else []
+
 # ✅ Create Product
 async def create_product(data):
     data["created_at"] = datetime.utcnow()
-    result = await db.products.insert_one(data)
-    new_product = await db.products.find_one({"_id": result.inserted_id})
-    return product_helper(new_product) 
+    try:
+        # insert_one fills in data["_id"], so the inserted document needs no re-read
+        await db.products.insert_one(data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="SKU already exists")
+    await catalog_version.bump()
+    return product_helper(data)
 
 # ✅ Update Product
 async def update_product(product_id: str, data: dict):
@@ -16,13 +43,17 @@ async def update_product(product_id: str, data: dict):
         return None
 
     data["updated_at"] = datetime.utcnow()
-    updated = await db.products.update_one(
-        {"_id": ObjectId(product_id)},
-        {"$set": data}
-    )
-    if updated.modified_count == 0:
+    try:
+        updated_product = await db.products.find_one_and_update(
+            {"_id": ObjectId(product_id)},
+            {"$set": data},
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="SKU already exists")
+    if not updated_product:
         return None
-    updated_product = await db.products.find_one({"_id": ObjectId(product_id)})
+    await catalog_version.bump()
     return updated_product
 
 # ✅ Delete Product
@@ -30,40 +61,88 @@ async def delete_product(product_id: str):
     if not ObjectId.is_valid(product_id):
         return False
     deleted = await db.products.delete_one({"_id": ObjectId(product_id)})
+    if deleted.deleted_count:
+        await catalog_version.bump()
     return deleted.deleted_count > 0
 
 # ✅ Get All Products
-async def get_all_products():
-    products = await db.products.find().to_list(length=None)
+MAX_PAGE_SIZE = 100
 
-    final_products = []
+# Listings never need the per-image variant records
+LISTING_FIELDS = [
+    "name", "price", "category", "description", "shortDescription", "sku", "stock",
+    "weight", "dimensions", "featured", "images", "thumbnail", "created_at",
+]
+LISTING_PROJECTION = {field: 1 for field in LISTING_FIELDS}
+
+async def attach_categories(products: list):
+    categories = await category_cache.get_many(
+        p["category"] for p in products if p.get("category")
+    )
     for product in products:
-        # Inject full category data
-        category_id = product.get("category")
-        if category_id:
-            category = await db.categories.find_one({"_id": ObjectId(category_id)})
-            if category:
-                product["category"] = category
-
-        # Defensive check before formatting
-        if "_id" in product:
-            final_products.append(product_helper(product))
-        else:
-            print("⚠ Skipped product without _id:", product)
-
-    return final_products
+        category = categories.get(str(product.get("category")))
+        if category:
+            product["category"] = category
+    return products
+
+def product_query(after: str = None) -> dict:
+    if not after:
+        return {}
+    if not ObjectId.is_valid(after):
+        raise ValueError("Invalid cursor")
+    return {"_id": {"$gt": ObjectId(after)}}
+
+async def list_products(limit: int = None, after: str = None):
+    """Return (products, next_cursor) ordered by _id.
+
+    `after` is the id of the last product of the previous page; the next
+    cursor is None once the final page has been served.
+    """
+    async with catalog_session() as session:
+        cursor = catalog_db.products.find(product_query(after), LISTING_PROJECTION, session=session).sort("_id", 1)
+        if limit:
+            limit = min(limit, MAX_PAGE_SIZE)
+            # Fetch one extra document to know whether another page exists
+            cursor = cursor.limit(limit + 1)
+
+        products = await cursor.to_list(length=None)
+    next_cursor = None
+    if limit and len(products) > limit:
+        products = products[:limit]
+        next_cursor = str(products[-1]["_id"])
+
+    await attach_categories(products)
+    return [product_listing_helper(p) for p in products], next_cursor
+
+STREAM_BATCH_SIZE = 500
+
+async def iter_products(query: dict = None):
+    # Formats products batch by batch straight off the cursor, for streamed responses
+    batch = []
+    async with catalog_session() as session:
+        cursor = catalog_db.products.find(query or {}, LISTING_PROJECTION, session=session)
+        async for product in cursor.sort("_id", 1).batch_size(STREAM_BATCH_SIZE):
+            batch.append(product)
+            if len(batch) >= STREAM_BATCH_SIZE:
+                for p in await attach_categories(batch):
+                    yield product_listing_helper(p)
+                batch = []
+    for p in await attach_categories(batch):
+        yield product_listing_helper(p)
+
 async def get_product_by_id(product_id: str):
     if not ObjectId.is_valid(product_id):
         return None
 
-    product = await db.products.find_one({"_id": ObjectId(product_id)})
+    async with catalog_session() as session:
+        product = await catalog_db.products.find_one({"_id": ObjectId(product_id)}, session=session)
 
     if not product:
         return None
 
     category_id = product.get("category")
-    if category_id and ObjectId.is_valid(str(category_id)):
-        category = await db.categories.find_one({"_id": ObjectId(category_id)})
+    if category_id:
+        category = await category_cache.get_by_id(category_id)
         if category:
             product["category"] = category
 
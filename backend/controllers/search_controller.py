@@ -0,0 +1,139 @@
+import asyncio
+from bson import ObjectId
+from core.database import catalog_db
+from core.category_cache import category_cache
+from core.catalog_version import catalog_session
+from controllers.product_controller import attach_categories, LISTING_PROJECTION
+from models.product_model import product_listing_helper
+
+MAX_SEARCH_LIMIT = 100
+PRICE_BUCKETS = [0, 100, 250, 500, 1000, 2500, 5000]
+# Facets only read these; a filter on nothing else lets the category_price index cover them
+FACET_FIELDS = {"category", "price"}
+
+SORTS = {
+    "relevance": [("_score", {"$meta": "textScore"}), ("_id", -1)],
+    "price_asc": [("price", 1), ("_id", 1)],
+    "price_desc": [("price", -1), ("_id", -1)],
+    "newest": [("created_at", -1), ("_id", -1)],
+}
+
+
+async def _category_ids(category: str) -> list:
+    # Accept either category ids or slugs, comma separated
+    ids = []
+    for value in (c.strip() for c in category.split(",")):
+        if not value:
+            continue
+        if ObjectId.is_valid(value):
+            ids.append(value)
+        else:
+            found = await category_cache.get_by_slug(value)
+            if found:
+                ids.append(str(found["_id"]))
+    return ids
+
+
+async def search_filter(q: str = None, category: str = None, min_price: float = None,
+                        max_price: float = None, featured: bool = None, in_stock: bool = None) -> dict:
+    match = {}
+    if q:
+        match["$text"] = {"$search": q}
+    if category:
+        match["category"] = {"$in": await _category_ids(category)}
+    if min_price is not None or max_price is not None:
+        match["price"] = {}
+        if min_price is not None:
+            match["price"]["$gte"] = min_price
+        if max_price is not None:
+            match["price"]["$lte"] = max_price
+    if featured is not None:
+        match["featured"] = featured
+    if in_stock is not None:
+        match["stock"] = {"$gt": 0} if in_stock else {"$lte": 0}
+    return match
+
+
+def page_cursor(match: dict, sort: str, skip: int, limit: int, text: bool = False, session=None):
+    """The requested page as its own find(), so its sort and skip can walk an index."""
+    projection = LISTING_PROJECTION
+    if text:
+        projection = {**LISTING_PROJECTION, "_score": {"$meta": "textScore"}}
+    return catalog_db.products.find(match, projection, session=session).sort(SORTS[sort]).skip(skip).limit(limit)
+
+
+def facet_pipeline(match: dict) -> list:
+    # Total and both facets in one aggregation; $facet can't use indexes, so it gets two fields per product
+    return [
+        {"$match": match},
+        {"$project": {"_id": 0, "category": 1, "price": 1}},
+        {
+            "$facet": {
+                "total": [{"$count": "count"}],
+                "categories": [
+                    {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                ],
+                "price": [
+                    {
+                        "$bucket": {
+                            "groupBy": "$price",
+                            "boundaries": PRICE_BUCKETS,
+                            "default": "above",
+                            "output": {"count": {"$sum": 1}},
+                        }
+                    }
+                ],
+            }
+        },
+    ]
+
+
+def facet_options(match: dict) -> dict:
+    return {"hint": "category_price"} if set(match) <= FACET_FIELDS else {}
+
+
+async def search_products(q: str = None, category: str = None, min_price: float = None,
+                          max_price: float = None, featured: bool = None, in_stock: bool = None,
+                          sort: str = "relevance", skip: int = 0, limit: int = 24) -> dict:
+    match = await search_filter(q, category, min_price, max_price, featured, in_stock)
+    if sort == "relevance" and not q:
+        sort = "newest"
+    limit = min(limit, MAX_SEARCH_LIMIT)
+
+    # One session each, since the two reads run concurrently
+    async with catalog_session() as page_session, catalog_session() as facet_session:
+        page, facet_result = await asyncio.gather(
+            page_cursor(match, sort, skip, limit, text=bool(q), session=page_session).to_list(length=limit),
+            catalog_db.products.aggregate(
+                facet_pipeline(match), session=facet_session, **facet_options(match)
+            ).to_list(length=1),
+        )
+    facets = facet_result[0] if facet_result else {"total": [], "categories": [], "price": []}
+
+    products = await attach_categories(page)
+    categories = await category_cache.get_many(f["_id"] for f in facets["categories"] if f["_id"])
+
+    return {
+        "results": [product_listing_helper(p) for p in products],
+        "total": facets["total"][0]["count"] if facets["total"] else 0,
+        "facets": {
+            "categories": [
+                {
+                    "id": str(f["_id"]) if f["_id"] else None,
+                    "name": categories.get(str(f["_id"]), {}).get("name", "Uncategorized"),
+                    "slug": categories.get(str(f["_id"]), {}).get("slug"),
+                    "count": f["count"],
+                }
+                for f in facets["categories"]
+            ],
+            "price": [_price_bucket(f) for f in facets["price"]],
+        },
+    }
+
+
+def _price_bucket(facet) -> dict:
+    if facet["_id"] == "above":
+        return {"min": PRICE_BUCKETS[-1], "max": None, "count": facet["count"]}
+    upper = PRICE_BUCKETS[PRICE_BUCKETS.index(facet["_id"]) + 1]
+    return {"min": facet["_id"], "max": upper, "count": facet["count"]}
@@ -1,26 +1,61 @@
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from core.database import db
 from models.wishlist_model import wishlist_item_helper
 from datetime import datetime
 
 async def add_to_wishlist(user_id: str, product_id: str):
-    exists = await db.wishlist.find_one({
-        "user_id": ObjectId(user_id),
-        "product_id": ObjectId(product_id)
-    })
-    if exists:
+    # One upsert on the (user_id, product_id) unique index instead of find-then-insert
+    try:
+        result = await db.wishlist.update_one(
+            {"user_id": ObjectId(user_id), "product_id": ObjectId(product_id)},
+            {"$setOnInsert": {"created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # A concurrent request inserted the same pair first
+        return {"message": "Already in wishlist"}
+    if result.upserted_id is None:
         return {"message": "Already in wishlist"}
+    return {"message": "Added to wishlist"}
 
-    await db.wishlist.insert_one({
-        "user_id": ObjectId(user_id),
-        "product_id": ObjectId(product_id),
-        "created_at": datetime.utcnow()
+async def get_user_wishlist(user_id: str, skip: int = 0, limit: int = None):
+    # One aggregation joins the products; $unwind drops rows whose product was deleted
+    pipeline = [
+        {"$match": {"user_id": ObjectId(user_id)}},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {
+            "$lookup": {
+                "from": "products",
+                "localField": "product_id",
+                "foreignField": "_id",
+                "as": "product"
+            }
+        },
+        {"$unwind": "$product"},
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({
+        "$project": {
+            "_id": 0,
+            "created_at": 1,
+            "product": {
+                "_id": "$product._id",
+                "name": "$product.name",
+                "price": "$product.price",
+                "originalPrice": "$product.originalPrice",
+                "images": "$product.images",
+                "thumbnail": "$product.thumbnail",
+                "stock": "$product.stock",
+                "featured": "$product.featured",
+            }
+        }
     })
-    return {"message": "Added to wishlist"}
 
-async def get_user_wishlist(user_id: str):
-    items = db.wishlist.find({"user_id": ObjectId(user_id)})
-    return [await wishlist_item_helper(item) async for item in items]
+    return [wishlist_item_helper(item) async for item in db.wishlist.aggregate(pipeline)]
 
 async def remove_from_wishlist(user_id: str, product_id: str):
     result = await db.wishlist.delete_one({
@@ -0,0 +1,56 @@
+import hashlib
+import os
+import time
+from core.metrics import external_call
+
+AI_BACKEND = os.getenv("AI_BACKEND", "gemini")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash-latest")
+# Simulated round trip for the fake client, so cache and coalescing effects show up in benchmarks
+AI_FAKE_LATENCY = float(os.getenv("AI_FAKE_LATENCY", "0.5"))
+
+
+class GeminiClient:
+    """Long-lived Gemini model; configured once on first use instead of per request."""
+
+    def __init__(self, model_name: str = GEMINI_MODEL):
+        self.model_name = model_name
+        self._model = None
+
+    def _get_model(self):
+        if self._model is None:
+            import google.generativeai as genai
+
+            api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
+            if not api_key:
+                raise RuntimeError("Google Gemini API key is missing")
+            genai.configure(api_key=api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt: str) -> str:
+        # Blocking SDK call; callers run it off the event loop
+        model = self._get_model()
+        with external_call("gemini", "generate_content"):
+            response = model.generate_content(prompt)
+        return response.text.strip()
+
+
+class FakeClient:
+    """Offline stand-in that returns a deterministic description after a fixed delay."""
+
+    def __init__(self, latency: float = AI_FAKE_LATENCY):
+        self.latency = latency
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha1(prompt.encode()).hexdigest()[:8]
+        return f"An elegant piece crafted to be treasured for years to come. [{digest}]"
+
+
+def get_ai_client(name: str = AI_BACKEND):
+    if name == "fake":
+        return FakeClient()
+    return GeminiClient()
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import time
+
+CART_CACHE_TTL = float(os.getenv("CART_CACHE_TTL", "30"))
+CART_CACHE_MAX_USERS = int(os.getenv("CART_CACHE_MAX_USERS", "10000"))
+
+
+def cart_version(lines) -> str:
+    # Derived from the cart contents, so every worker computes the same ETag
+    digest = hashlib.sha1()
+    for line in sorted(lines, key=lambda l: l["product_id"]):
+        product = line["product"]
+        digest.update(
+            f'{line["product_id"]}:{line["quantity"]}:{product.get("price")}:{product.get("stock")};'.encode()
+        )
+    return digest.hexdigest()[:16]
+
+
+def cart_totals(lines) -> dict:
+    return {
+        "items": len(lines),
+        "quantity": sum(line["quantity"] for line in lines),
+        "subtotal": round(sum(line["quantity"] * (line["product"].get("price") or 0) for line in lines), 2),
+    }
+
+
+class CartCache:
+    """Short-lived per-user copy of the projected cart lines.
+
+    Each entry records the cart revision (a per-user counter in Mongo that
+    every cart write increments) it is current for. Mutations patch the
+    changed line in place so their responses can carry full totals without
+    re-running the cart aggregation; if the revision a write returns shows
+    another worker wrote in between, the entry is dropped instead.
+    """
+
+    def __init__(self, ttl: float = CART_CACHE_TTL, max_users: int = CART_CACHE_MAX_USERS):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._carts = {}
+
+    def get(self, user_id: str):
+        entry = self._carts.get(user_id)
+        if entry is None:
+            return None
+        expires_at, _, lines = entry
+        if time.monotonic() > expires_at:
+            self._carts.pop(user_id, None)
+            return None
+        return lines
+
+    def put(self, user_id: str, lines: list, revision: int):
+        if len(self._carts) >= self.max_users and user_id not in self._carts:
+            # Drop the oldest entry; dicts keep insertion order
+            self._carts.pop(next(iter(self._carts)))
+        self._carts[user_id] = (time.monotonic() + self.ttl, revision, {line["product_id"]: line for line in lines})
+
+    def apply(self, user_id: str, revision: int, line: dict = None, removed: str = None):
+        """Patch the entry after this worker's write took the cart to `revision`."""
+        entry = self._carts.get(user_id)
+        if entry is None:
+            return
+        expires_at, cached_revision, lines = entry
+        if cached_revision != revision - 1:
+            self._carts.pop(user_id, None)
+            return
+        if line is not None:
+            lines[line["product_id"]] = line
+        if removed is not None:
+            lines.pop(removed, None)
+        self._carts[user_id] = (expires_at, revision, lines)
+
+    def invalidate(self, user_id: str):
+        self._carts.pop(user_id, None)
+
+
+cart_cache = CartCache()
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import Request, Response
+from pymongo import ReturnDocument
+from core.database import client, db, MONGO_CATALOG_READ_PREFERENCE
+
+CATALOG_VERSION_SYNC_INTERVAL = float(os.getenv("CATALOG_VERSION_SYNC_INTERVAL", "2"))
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "0"))
+
+_DOC_ID = "catalog"
+
+# Secondaries can lag the primary, so their reads must wait for the token's writes
+_CAUSAL_READS = MONGO_CATALOG_READ_PREFERENCE != "primary"
+
+
+class CatalogVersion:
+    """Counter bumped on every catalog write, stored in `meta` and mirrored in memory.
+
+    The mirror is re-read at most once per sync interval, so conditional GETs
+    are answered without a database round trip. The `epoch` is fixed when the
+    document is first created, so a reset database never reuses old ETags.
+    When catalog reads go off the primary, the cluster and operation times of
+    the command that returned the token are kept with it for `catalog_session`.
+    """
+
+    def __init__(self, sync_interval: float = CATALOG_VERSION_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self._token = None
+        self._synced_at = None
+        self.times = None
+        self._lock = asyncio.Lock()
+
+    def _store(self, doc, times=None):
+        self._token = f'{doc["epoch"]}.{doc["version"]}'
+        self.times = times
+        self._synced_at = time.monotonic()
+
+    def _is_fresh(self) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_interval
+
+    async def _sync(self, update: dict):
+        options = {"upsert": True, "return_document": ReturnDocument.AFTER}
+        if not _CAUSAL_READS:
+            self._store(await db.meta.find_one_and_update({"_id": _DOC_ID}, update, **options))
+            return
+        async with await client.start_session() as session:
+            doc = await db.meta.find_one_and_update({"_id": _DOC_ID}, update, session=session, **options)
+            self._store(doc, (session.cluster_time, session.operation_time))
+
+    async def _load(self):
+        # Upsert so the first reader creates the document with its epoch
+        await self._sync({"$setOnInsert": {"epoch": uuid.uuid4().hex[:8], "version": 0}})
+
+    async def current(self) -> str:
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    await self._load()
+        return self._token
+
+    async def bump(self):
+        await self._sync({"$inc": {"version": 1}, "$setOnInsert": {"epoch": uuid.uuid4().hex[:8]}})
+
+
+catalog_version = CatalogVersion()
+
+
+@asynccontextmanager
+async def catalog_session():
+    """Session to pass to a `catalog_db` read, or None when those go to the primary.
+
+    Off the primary it is causally consistent from the command that returned the
+    current token, so the member serving the read waits until it has applied
+    that catalog version. Sessions can't be shared by concurrent operations.
+    """
+    if not _CAUSAL_READS:
+        yield None
+        return
+    await catalog_version.current()
+    cluster_time, operation_time = catalog_version.times
+    async with await client.start_session(causal_consistency=True) as session:
+        session.advance_cluster_time(cluster_time)
+        session.advance_operation_time(operation_time)
+        yield session
+
+
+async def catalog_etag(*parts, token: str = None) -> str:
+    """ETag for a catalog response; a body read before this call passes the `token` taken before that read."""
+    token = token or await catalog_version.current()
+    key = "|".join([token, *(str(p) for p in parts)])
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}, must-revalidate",
+    }
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [c.strip() for c in header.split(",")]
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def not_modified(request: Request, etag: str):
+    """A 304 response when the client already holds this ETag, otherwise None."""
+    if _matches(request, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
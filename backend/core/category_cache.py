@@ -0,0 +1,110 @@
+import asyncio
+import os
+import time
+from core.database import db
+from core.catalog_version import catalog_version
+
+CATEGORY_CACHE_TTL = float(os.getenv("CATEGORY_CACHE_TTL", "300"))
+
+
+class CategoryCache:
+    """In-process copy of the categories collection, keyed by id and slug.
+
+    The whole collection is reloaded when the TTL lapses or the shared
+    catalog version moves (an admin write on any worker); every other read
+    is served from memory. Catalog ETags come from that version, so a body
+    built from this cache is never older than the ETag it goes out under.
+    """
+
+    def __init__(self, ttl: float = CATEGORY_CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._by_id = {}
+        self._by_slug = {}
+        self._loaded_at = None
+        self._loaded_token = None
+        self._writes = 0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self, token: str = None) -> bool:
+        if token is not None and token != self._loaded_token:
+            return False
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def refresh(self):
+        """Reload the collection now, e.g. after an admin write; reloads never overlap."""
+        token = await catalog_version.current()
+        async with self._lock:
+            await self._reload(token)
+
+    async def _reload(self, token: str):
+        writes = self._writes
+        by_id, by_slug = {}, {}
+        async for category in db.categories.find():
+            by_id[str(category["_id"])] = category
+            if category.get("slug"):
+                by_slug[category["slug"]] = category
+        # Swap both maps at once so readers never see a half-built cache
+        self._by_id, self._by_slug = by_id, by_slug
+        # A put() while the cursor ran may be missing from what we just read; reload on next use
+        self._loaded_at = time.monotonic() if self._writes == writes else None
+        self._loaded_token = token
+        self.reloads += 1
+
+    def put(self, category: dict):
+        """Store a category this worker just wrote, sparing a full reload."""
+        self._writes += 1
+        previous = self._by_id.get(str(category["_id"]))
+        if previous and previous.get("slug") and self._by_slug.get(previous["slug"]) is previous:
+            del self._by_slug[previous["slug"]]
+        self._by_id[str(category["_id"])] = category
+        if category.get("slug"):
+            self._by_slug[category["slug"]] = category
+
+    async def _ensure_loaded(self):
+        # Read before loading, so the maps are at least as new as this token
+        token = await catalog_version.current()
+        if self._is_fresh(token):
+            self.hits += 1
+            return
+        async with self._lock:
+            # Another request may have reloaded while we waited for the lock
+            if self._is_fresh(token):
+                self.hits += 1
+                return
+            self.misses += 1
+            await self._reload(token)
+
+    async def get_by_id(self, category_id):
+        await self._ensure_loaded()
+        return self._by_id.get(str(category_id))
+
+    async def get_by_slug(self, slug: str):
+        await self._ensure_loaded()
+        return self._by_slug.get(slug)
+
+    async def get_many(self, category_ids) -> dict:
+        await self._ensure_loaded()
+        return {
+            str(cid): self._by_id[str(cid)]
+            for cid in category_ids
+            if str(cid) in self._by_id
+        }
+
+    async def all(self) -> list:
+        await self._ensure_loaded()
+        return list(self._by_id.values())
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "size": len(self._by_id),
+            "ttl_seconds": self.ttl,
+        }
+
+
+category_cache = CategoryCache()
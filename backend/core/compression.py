@@ -0,0 +1,162 @@
+import gzip
+import os
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip alone still works
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Minimum size per path prefix (longest prefix wins); None turns compression off.
+# Auth responses carry tokens next to user input, so they are never compressed (BREACH).
+COMPRESSION_ROUTES = {
+    "/api/auth": None,
+    "/auth": None,
+    "/uploads": None,
+    "/api/orders/export": 0,
+    "/api/products/all": 0,
+}
+
+# Already-compressed media gains nothing from another pass
+_SKIP_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def negotiate(accept_encoding: str):
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+
+    def accepted(name):
+        return offered.get(name, offered.get("*", 0.0)) > 0
+
+    if brotli is not None and accepted("br"):
+        return "br"
+    if accepted("gzip"):
+        return "gzip"
+    return None
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish() if self.encoding == "br" else self._compressor.flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """Negotiated brotli/gzip for responses above a per-route size threshold.
+
+    Buffered responses are compressed only when their body reaches the
+    threshold. Streamed responses (more_body) are compressed chunk by chunk,
+    flushing after each one so NDJSON exports still arrive incrementally.
+    Encoded responses carry a weak ETag, since their bytes differ from the
+    identity body.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, routes: dict = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.routes = sorted((routes or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def threshold(self, path: str):
+        for prefix, size in self.routes:
+            if path.startswith(prefix):
+                return size
+        return self.minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        threshold = self.threshold(scope["path"])
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", "")) if threshold is not None else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+                skip = (
+                    start["status"] in (204, 304)
+                    or (not body and not more_body)
+                    or "content-encoding" in headers
+                    or content_type.startswith(_SKIP_TYPES)
+                    or (not more_body and len(body) < threshold)
+                )
+                if skip:
+                    passthrough = True
+                    await send(start)
+                else:
+                    headers["Content-Encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    # The encoded bytes differ from the identity body a strong ETag names
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = "W/" + etag
+                    if more_body:
+                        del headers["Content-Length"]
+                        encoder = _Encoder(encoding)
+                    else:
+                        body = compress(body, encoding)
+                        headers["Content-Length"] = str(len(body))
+                    await send(start)
+                start = None
+
+            if passthrough:
+                await send(message)
+            elif encoder is None:
+                await send({"type": "http.response.body", "body": body})
+            else:
+                chunk = encoder.compress(body) if body else b""
+                if not more_body:
+                    chunk += encoder.finish()
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
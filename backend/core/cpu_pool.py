@@ -0,0 +1,56 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16"))
+
+
+class CPUPool:
+    """Runs blocking work (bcrypt, SDK calls) on worker threads with admission control.
+
+    At most `workers` calls run at once and `max_queue` more may wait; anything
+    beyond that is rejected straight away with a 503 instead of piling up.
+    Threads can't be interrupted, so a call that times out keeps its slot
+    until its thread actually returns.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self._pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self, future):
+        self._pending -= 1
+        if not future.cancelled():
+            future.exception()  # mark retrieved; the caller may have stopped waiting
+
+    async def run(self, fn, *args, timeout: float = None):
+        if self._pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, fn, *args)
+        # The slot is freed when the thread finishes, not when the caller gives
+        # up, so calls that time out still count until their thread is done
+        future.add_done_callback(self._release)
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+password_pool = CPUPool("bcrypt", PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
@@ -1,9 +1,96 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from dotenv import load_dotenv
 import os
+from core.metrics import MongoCommandListener, MongoPoolListener
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["smf_jewels"]
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "smf_jewels")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+
+# Where catalog/listing reads go. Off the primary, each read runs in a causally
+# consistent session, so a lagging member waits until it has the catalog
+# version named by the ETag instead of serving older data under it.
+MONGO_CATALOG_READ_PREFERENCE = os.getenv("MONGO_CATALOG_READ_PREFERENCE", "primary")
+MONGO_CATALOG_MAX_STALENESS = int(os.getenv("MONGO_CATALOG_MAX_STALENESS", "-1"))
+
+_READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+pool_listener = MongoPoolListener(MONGO_MAX_POOL_SIZE)
+
+
+def read_preference(mode: str, max_staleness: int = -1):
+    if mode not in _READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference {mode!r}")
+    if mode == "primary":
+        return Primary()
+    return _READ_PREFERENCES[mode](max_staleness=max_staleness)
+
+
+# Resolved at import so a bad setting stops the app at startup, not on the first listing
+CATALOG_READ_PREFERENCE = read_preference(MONGO_CATALOG_READ_PREFERENCE, MONGO_CATALOG_MAX_STALENESS)
+
+
+class MongoConnection:
+    """Owns the Motor client; opened by the app lifespan and closed on shutdown.
+
+    Scripts that never run the lifespan get a client on first use instead.
+    """
+
+    def __init__(self):
+        self.client = None
+
+    def connect(self):
+        if self.client is None:
+            self.client = AsyncIOMotorClient(
+                MONGO_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+                waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                event_listeners=[MongoCommandListener(), pool_listener],
+            )
+        return self.client
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+
+connection = MongoConnection()
+
+
+class _Proxy:
+    """Stands in for a client or database so modules can import it before connecting."""
+
+    def __init__(self, resolve):
+        self._resolve = resolve
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __getitem__(self, name):
+        return self._resolve()[name]
+
+
+client = _Proxy(connection.connect)
+# Primary reads and all writes: carts, orders, auth, admin edits
+db = _Proxy(lambda: connection.connect()[MONGO_DB_NAME])
+# Catalog, category and listing reads, routed by MONGO_CATALOG_READ_PREFERENCE
+catalog_db = _Proxy(lambda: connection.connect().get_database(MONGO_DB_NAME, read_preference=CATALOG_READ_PREFERENCE))
@@ -5,14 +5,14 @@ from core.jwt_handler import decode_access_token, is_token_blacklisted  # 👈 i
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")  # 👈 corrected route
 
 async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
-    # 🔒 Check if token is blacklisted
-    if await is_token_blacklisted(token):
-        raise HTTPException(status_code=401, detail="Token has been revoked (logged out)")
-
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    # 🔒 Check if token is blacklisted
+    if await is_token_blacklisted(payload, token):
+        raise HTTPException(status_code=401, detail="Token has been revoked (logged out)")
+
     return payload
 
 async def is_admin(user: dict = Depends(get_current_user)):
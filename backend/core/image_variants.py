@@ -0,0 +1,93 @@
+import io
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANT_BACKEND = os.getenv("IMAGE_VARIANT_BACKEND", "pillow")
+IMAGE_VARIANT_FORMATS = [f.strip() for f in os.getenv("IMAGE_VARIANT_FORMATS", "webp,avif").split(",") if f.strip()]
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+
+# Longest edge in pixels; images are never upscaled
+VARIANT_SIZES = {"thumbnail": 200, "card": 600, "detail": 1600}
+
+# The format listing payloads link to; every browser we support decodes it
+THUMBNAIL_FORMAT = "webp"
+
+
+class PillowVariantGenerator:
+    """Resizes and re-encodes images locally with Pillow."""
+
+    def __init__(self, sizes: dict = VARIANT_SIZES, formats: list = IMAGE_VARIANT_FORMATS,
+                 quality: int = IMAGE_VARIANT_QUALITY):
+        from PIL import features
+
+        self.sizes = sizes
+        self.quality = quality
+        self.formats = [f for f in formats if features.check(f)]
+        for skipped in set(formats) - set(self.formats):
+            logger.warning("Pillow has no %s encoder; skipping %s variants", skipped, skipped)
+
+    def generate(self, data: bytes):
+        """Return ((width, height), [variant]) where each variant carries its encoded bytes."""
+        from PIL import Image, ImageOps, UnidentifiedImageError
+
+        try:
+            source = Image.open(io.BytesIO(data))
+            source.load()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            raise ValueError("File is not a supported image")
+
+        with source:
+            # Apply the camera's EXIF rotation before measuring anything
+            image = ImageOps.exif_transpose(source)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+            original = image.size
+
+            variants = []
+            for name, edge in self.sizes.items():
+                resized = image.copy()
+                resized.thumbnail((edge, edge), Image.LANCZOS)
+                for fmt in self.formats:
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format=fmt.upper(), quality=self.quality)
+                    variants.append({
+                        "name": name,
+                        "format": fmt,
+                        "width": resized.width,
+                        "height": resized.height,
+                        "data": buffer.getvalue(),
+                    })
+        return original, variants
+
+
+class NoVariantGenerator:
+    """Keeps only the original upload."""
+
+    def generate(self, data: bytes):
+        return None, []
+
+
+def get_variant_generator(name: str = IMAGE_VARIANT_BACKEND):
+    if name == "none":
+        return NoVariantGenerator()
+    return PillowVariantGenerator()
+
+
+def image_record(uploaded: dict) -> dict:
+    """What gets stored per image: the original plus its variants, without raw bytes."""
+    return {
+        "url": uploaded["url"],
+        "public_id": uploaded["public_id"],
+        "width": uploaded.get("width"),
+        "height": uploaded.get("height"),
+        "variants": uploaded.get("variants", []),
+    }
+
+
+def thumbnail_url(record: dict):
+    thumbnails = [v for v in record.get("variants", []) if v["name"] == "thumbnail"]
+    preferred = [v for v in thumbnails if v["format"] == THUMBNAIL_FORMAT]
+    chosen = (preferred or thumbnails or [None])[0]
+    return chosen["url"] if chosen else None
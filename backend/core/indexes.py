@@ -0,0 +1,205 @@
+import logging
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import PyMongoError
+from core.database import db
+
+logger = logging.getLogger(__name__)
+
+# Every secondary index the controllers rely on, by collection
+INDEXES = {
+    "products": [
+        IndexModel(
+            [("name", TEXT), ("sku", TEXT), ("shortDescription", TEXT), ("description", TEXT)],
+            weights={"name": 10, "sku": 8, "shortDescription": 4, "description": 1},
+            name="product_text",
+        ),
+        IndexModel([("category", ASCENDING), ("price", ASCENDING)], name="category_price"),
+        IndexModel([("featured", ASCENDING), ("price", ASCENDING)], name="featured_price"),
+        IndexModel([("price", ASCENDING)], name="price"),
+        IndexModel([("created_at", DESCENDING)], name="created"),
+        IndexModel([("stock", ASCENDING), ("price", ASCENDING)], name="stock_price"),
+        # Products created without a sku keep "", so only real skus must be unique
+        IndexModel(
+            [("sku", ASCENDING)], unique=True,
+            partialFilterExpression={"sku": {"$gt": ""}}, name="sku_unique",
+        ),
+    ],
+    "cart_items": [
+        IndexModel([("user_id", ASCENDING), ("product_id", ASCENDING)], unique=True, name="user_product"),
+    ],
+    "wishlist": [
+        IndexModel([("user_id", ASCENDING), ("product_id", ASCENDING)], unique=True, name="user_product"),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created"),
+    ],
+    "orders": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_created"),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created"),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "categories": [
+        IndexModel([("slug", ASCENDING)], unique=True, name="slug_unique"),
+    ],
+    "blacklisted_tokens": [
+        IndexModel([("jti", ASCENDING)], unique=True, sparse=True, name="jti_unique"),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+    ],
+    "rate_limits": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+}
+
+# Options that make two indexes on the same keys behave differently
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "weights", "partialFilterExpression")
+
+_SAMPLE_ID = ObjectId("000000000000000000000000")
+
+# Representative filters for the hot controller queries; each must be served by an index
+HOT_QUERIES = [
+    ("products", {"category": {"$in": [str(_SAMPLE_ID)]}, "price": {"$gte": 100}}, [("price", ASCENDING)]),
+    ("products", {"featured": True}, [("price", ASCENDING)]),
+    ("products", {"price": {"$gte": 100, "$lte": 500}}, None),
+    ("products", {"$text": {"$search": "ring"}}, None),
+    ("products", {"sku": "RING-000001"}, None),
+    ("cart_items", {"user_id": _SAMPLE_ID}, None),
+    ("cart_items", {"user_id": _SAMPLE_ID, "product_id": _SAMPLE_ID}, None),
+    ("wishlist", {"user_id": _SAMPLE_ID}, [("created_at", DESCENDING)]),
+    ("wishlist", {"user_id": _SAMPLE_ID, "product_id": _SAMPLE_ID}, None),
+    ("orders", {"user_id": _SAMPLE_ID}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("orders", {"status": "Pending"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("orders", {"created_at": {"$gte": datetime(2000, 1, 1)}}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("users", {"email": "someone@example.com"}, None),
+    ("categories", {"slug": "rings"}, None),
+    ("blacklisted_tokens", {"jti": "0" * 32}, None),
+    ("blacklisted_tokens", {"revoked_at": {"$gt": datetime(2000, 1, 1)}}, None),
+]
+
+# Search parameters (see controllers/search_controller.py); both the page query
+# and the facet aggregation a search runs must be served by an index
+HOT_SEARCHES = [
+    {},
+    {"category": str(_SAMPLE_ID)},
+    {"category": str(_SAMPLE_ID), "min_price": 100, "sort": "price_asc"},
+    {"min_price": 100, "max_price": 500, "sort": "price_desc"},
+    {"featured": True},
+    {"in_stock": True},
+    {"q": "ring"},
+]
+
+
+def _declared_spec(model: IndexModel) -> dict:
+    document = model.document
+    # Text fields are identified by their weights, as the server reports them
+    spec = {"key": [(f, d) for f, d in document["key"].items() if d != TEXT]}
+    spec.update({opt: document[opt] for opt in _COMPARED_OPTIONS if opt in document})
+    return spec
+
+
+def _existing_spec(info: dict) -> dict:
+    spec = {"key": [(f, d) for f, d in info["key"] if f not in ("_fts", "_ftsx") and d != TEXT]}
+    spec.update({opt: info[opt] for opt in _COMPARED_OPTIONS if opt in info})
+    return spec
+
+
+async def index_drift() -> dict:
+    """Compare declared indexes with the live ones, per collection."""
+    report = {}
+    for collection, models in INDEXES.items():
+        existing = await db[collection].index_information()
+        existing.pop("_id_", None)
+        declared = {m.document["name"]: m for m in models}
+
+        missing = [name for name in declared if name not in existing]
+        changed = [
+            name for name, model in declared.items()
+            if name in existing and _declared_spec(model) != _existing_spec(existing[name])
+        ]
+        undeclared = [name for name in existing if name not in declared]
+        if missing or changed or undeclared:
+            report[collection] = {"missing": missing, "changed": changed, "undeclared": undeclared}
+    return report
+
+
+async def ensure_indexes() -> dict:
+    """Create every declared index (a no-op when it already exists) and return any drift."""
+    errors = {}
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+        except PyMongoError as e:
+            # Usually an existing index with the same name but different options,
+            # or duplicates blocking a unique index; leave it for a human.
+            errors[collection] = str(e)
+            logger.error("Could not create indexes on %s: %s", collection, e)
+
+    drift = await index_drift()
+    for collection, problems in drift.items():
+        logger.warning("Index drift on %s: %s", collection, problems)
+    return {"errors": errors, "drift": drift}
+
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for child in plan.get("inputStages", []) + [plan.get("inputStage")]:
+        if child:
+            yield from _plan_stages(child)
+
+
+def _winning_plans(explained):
+    # Aggregations nest the planner output under their $cursor stage; find every winning plan
+    if isinstance(explained, dict):
+        if "winningPlan" in explained:
+            plan = explained["winningPlan"]
+            # Newer servers nest the classic plan under queryPlan
+            yield plan.get("queryPlan", plan)
+        for value in explained.values():
+            yield from _winning_plans(value)
+    elif isinstance(explained, list):
+        for value in explained:
+            yield from _winning_plans(value)
+
+
+def _scans_collection(explained: dict) -> bool:
+    return any("COLLSCAN" in _plan_stages(plan) for plan in _winning_plans(explained))
+
+
+async def _search_scans() -> list:
+    # Imported here rather than at the top: core doesn't otherwise depend on
+    # controllers, but the plan check has to explain the queries search really runs
+    from controllers.search_controller import search_filter, page_cursor, facet_pipeline, facet_options
+
+    offenders = []
+    for params in HOT_SEARCHES:
+        filters = {k: v for k, v in params.items() if k != "sort"}
+        sort = params.get("sort", "relevance" if "q" in params else "newest")
+        match = await search_filter(**filters)
+        page = await page_cursor(match, sort, 0, 24, text="q" in params).explain()
+        facets = await db.command(
+            "aggregate", "products", pipeline=facet_pipeline(match), explain=True, **facet_options(match)
+        )
+        for part, explained in (("page", page), ("facets", facets)):
+            if _scans_collection(explained):
+                offenders.append({"collection": "products", "search": params, "part": part})
+    return offenders
+
+
+async def collection_scans() -> list:
+    """Return the hot queries and searches whose winning plan contains a COLLSCAN."""
+    offenders = []
+    for collection, query, sort in HOT_QUERIES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        if _scans_collection(await cursor.explain()):
+            offenders.append({"collection": collection, "query": query, "sort": sort})
+    return offenders + await _search_scans()
+
+
+async def assert_no_collection_scans():
+    offenders = await collection_scans()
+    assert not offenders, f"Queries doing a COLLSCAN: {offenders}"
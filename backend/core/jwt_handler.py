@@ -1,19 +1,20 @@
 from datetime import datetime, timedelta
+import uuid
 from jose import jwt, JWTError
 import os
 from dotenv import load_dotenv
-from core.database import db 
+from core.token_revocation import revocation_store, token_key
 load_dotenv()
 
 SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
 
-# ✅ Create JWT token with "id" key
+# ✅ Create JWT token with "id" key and a unique "jti" used for revocation
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(hours=12)):
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -33,6 +34,13 @@ def verify_access_token(token: str):
         return payload
     except JWTError:
         return None
-async def is_token_blacklisted(token: str) -> bool:
-    exists = await db.blacklisted_tokens.find_one({"token": token})
-    return exists is not None
\ No newline at end of file
+
+
+# ✅ Revocation checks are served from the in-memory mirror, not a per-request query
+async def is_token_blacklisted(payload: dict, token: str) -> bool:
+    return await revocation_store.is_revoked(token_key(payload, token))
+
+
+async def blacklist_token(payload: dict, token: str):
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    await revocation_store.revoke(token_key(payload, token), expires_at)
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import contextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from pymongo import monitoring
+
+EVENT_LOOP_LAG_INTERVAL = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status",
+    ["method", "route", "status"], buckets=_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served", ["method"])
+
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and command",
+    ["collection", "command"], buckets=_LATENCY_BUCKETS,
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands", ["collection", "command"],
+)
+
+MONGO_POOL_CHECKED_OUT = Gauge("mongo_pool_checked_out_connections", "Connections currently checked out, per server pool", ["address"])
+MONGO_POOL_WAITING = Gauge("mongo_pool_wait_queue", "Operations waiting for a pooled connection, per server pool", ["address"])
+
+EXTERNAL_CALL_DURATION = Histogram(
+    "external_call_duration_seconds", "Latency of calls to third-party services",
+    ["service", "operation", "outcome"], buckets=_LATENCY_BUCKETS,
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping task",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+def route_template(scope) -> str:
+    """The matched route's path template, e.g. /api/products/{product_id}."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if not path:
+        # Unmatched paths share one label so random URLs can't blow up cardinality
+        return "unmatched"
+    # Included routers may report their routes without the router prefix;
+    # recover it as the part of the request path in front of the match.
+    request_path = scope["path"]
+    start = 0
+    while start != -1:
+        if route.path_regex.match(request_path[start:]):
+            return request_path[:start] + path
+        start = request_path.find("/", start + 1)
+    return path
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and labels it with its route template, not the raw path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(method, route_template(scope), str(status)).observe(time.perf_counter() - start)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Feeds command latency into MONGO_COMMAND_DURATION.
+
+    The collection name is only on the started event, so it is kept by
+    request id until the matching succeeded/failed event arrives.
+    """
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Counts connections checked out of, and requests queued for, each server's pool.
+
+    maxPoolSize applies per server, so saturation is that of the busiest pool
+    rather than the sum across a replica set. The driver calls these hooks
+    from its own threads, so every read and update of the counts holds a lock.
+    """
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self.pools = {}  # "host:port" -> {"checked_out": n, "waiting": n}
+        self._lock = threading.Lock()
+
+    @property
+    def checked_out(self) -> int:
+        with self._lock:
+            return sum(p["checked_out"] for p in self.pools.values())
+
+    @property
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(p["waiting"] for p in self.pools.values())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pools = {address: dict(p) for address, p in self.pools.items()}
+        busiest = max((p["checked_out"] for p in pools.values()), default=0)
+        return {
+            "checked_out": sum(p["checked_out"] for p in pools.values()),
+            "waiting": sum(p["waiting"] for p in pools.values()),
+            "max_pool_size": self.max_pool_size,
+            "saturation": round(busiest / self.max_pool_size, 3) if self.max_pool_size else None,
+            "pools": pools,
+        }
+
+    def _update(self, event, checked_out: int = 0, waiting: int = 0):
+        address = _address(event)
+        with self._lock:
+            pool = self.pools.setdefault(address, {"checked_out": 0, "waiting": 0})
+            pool["checked_out"] += checked_out
+            pool["waiting"] += waiting
+            MONGO_POOL_CHECKED_OUT.labels(address).set(pool["checked_out"])
+            MONGO_POOL_WAITING.labels(address).set(pool["waiting"])
+
+    def connection_check_out_started(self, event):
+        self._update(event, waiting=1)
+
+    def connection_checked_out(self, event):
+        self._update(event, checked_out=1, waiting=-1)
+
+    def connection_check_out_failed(self, event):
+        self._update(event, waiting=-1)
+
+    def connection_checked_in(self, event):
+        self._update(event, checked_out=-1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        # A server that left the topology shouldn't hold its last counts forever
+        address = _address(event)
+        with self._lock:
+            if self.pools.pop(address, None) is not None:
+                MONGO_POOL_CHECKED_OUT.remove(address)
+                MONGO_POOL_WAITING.remove(address)
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+@contextmanager
+def external_call(service: str, operation: str):
+    """Time a call to Cloudinary, Gemini, etc.; usable from worker threads."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_DURATION.labels(service, operation, outcome).observe(time.perf_counter() - start)
+
+
+async def monitor_event_loop(interval: float = EVENT_LOOP_LAG_INTERVAL):
+    # A task that asks to sleep `interval`; anything beyond that is time the loop was busy
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, time.perf_counter() - start - interval))
+
+
+def render_metrics():
+    return generate_latest(), CONTENT_TYPE_LATEST
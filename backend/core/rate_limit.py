@@ -0,0 +1,256 @@
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from starlette.datastructures import Headers
+from core.database import db
+from core.jwt_handler import decode_access_token
+from core.responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+# "memory" keeps buckets per worker; "mongo" shares them between workers through one collection
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Requests allowed to run at once, per worker, across every route marked heavy
+HEAVY_ROUTE_CONCURRENCY = int(os.getenv("HEAVY_ROUTE_CONCURRENCY", "32"))
+
+
+@dataclass
+class RateLimit:
+    """`count` requests per `period` seconds, with bursts of up to `count`."""
+    name: str
+    count: int
+    period: float
+    key: str = "ip"  # "ip", or "user" (falls back to the ip for anonymous calls)
+    heavy: bool = False
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.count
+
+
+def _limit(name: str, default: str, key: str = "ip", heavy: bool = False):
+    """Build a RateLimit, overridable as RATE_LIMIT_<NAME>="<count>/<seconds>" or "off"."""
+    spec = os.getenv(f"RATE_LIMIT_{name.upper()}", default)
+    if spec.lower() == "off":
+        return None
+    count, _, period = spec.partition("/")
+    return RateLimit(name, int(count), float(period or 60), key, heavy)
+
+
+_LOGIN = _limit("login", "10/60")
+_SIGNUP = _limit("signup", "5/60")
+_AI_DESCRIPTION = _limit("ai_description", "20/60", key="user", heavy=True)
+_AI_JOBS = _limit("ai_jobs", "5/60", key="user")
+_UPLOAD = _limit("upload", "30/60", key="user", heavy=True)
+_IMPORT = _limit("import", "5/60", key="user", heavy=True)
+_CATALOG_SCAN = _limit("catalog_scan", "60/60", heavy=True)
+_EXPORT = _limit("export", "5/60", key="user", heavy=True)
+
+# (method, path prefix) -> limit; the longest matching prefix wins. Routes
+# sharing a RateLimit share its bucket, e.g. every image upload route.
+RATE_LIMIT_ROUTES = {
+    ("POST", "/api/auth/login"): _LOGIN,
+    ("POST", "/api/auth/signup"): _SIGNUP,
+    ("POST", "/api/ai/generate-description"): _AI_DESCRIPTION,
+    ("POST", "/api/ai/jobs"): _AI_JOBS,
+    ("POST", "/api/products/add-product"): _UPLOAD,
+    ("PUT", "/api/products/update-product/"): _UPLOAD,
+    ("POST", "/api/category/add-category"): _UPLOAD,
+    ("PUT", "/api/category/update-category/"): _UPLOAD,
+    ("POST", "/api/products/import"): _IMPORT,
+    ("GET", "/api/products/all"): _CATALOG_SCAN,
+    ("GET", "/api/orders/export"): _EXPORT,
+}
+
+
+class MemoryBuckets:
+    """Token buckets held in this worker, as GCRA "theoretical arrival times".
+
+    Each key stores one float: the time at which its bucket would be full
+    again. Checks never await, so no lock is needed on the event loop. At
+    most `max_keys` buckets are kept; past that the least recently used are
+    dropped, which lets those clients start over with a full bucket.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._tat = {}
+
+    def _evict(self, now: float):
+        # Buckets that have refilled completely carry no state worth keeping
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+        # Still full (e.g. a flood of distinct ips): drop the least recently used tenth
+        overflow = len(self._tat) - self.max_keys + 1
+        if overflow > 0:
+            for key in list(islice(self._tat, max(overflow, self.max_keys // 10))):
+                del self._tat[key]
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """0 when the request may proceed, otherwise seconds until it would."""
+        now = time.time()
+        tat = max(self._tat.get(key, now), now) + limit.interval
+        wait = tat - now - limit.period
+        if wait > 0:
+            return wait
+        if key not in self._tat and len(self._tat) >= self.max_keys:
+            self._evict(now)
+        # Re-insert so the dict stays ordered from least to most recently used
+        self._tat.pop(key, None)
+        self._tat[key] = tat
+        return 0.0
+
+
+class MongoBuckets:
+    """The same buckets kept in `rate_limits`, so all workers draw from one.
+
+    The first update clamps the arrival time to now; the second only spends
+    a token if the bucket still has one, so concurrent workers can't overdraw.
+    Mongo errors let the request through rather than taking the route down.
+    """
+
+    def __init__(self, collection=None):
+        self.collection = collection if collection is not None else db.rate_limits
+
+    async def _clamp(self, key: str, now: float, limit: RateLimit) -> float:
+        update = {
+            "$max": {"tat": now},
+            "$set": {"expires_at": datetime.utcnow() + timedelta(seconds=limit.period + limit.interval)},
+        }
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": key}, update, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another worker created the bucket between our find and insert
+            doc = await self.collection.find_one_and_update(
+                {"_id": key}, update, return_document=ReturnDocument.AFTER,
+            )
+        return doc["tat"]
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        now = time.time()
+        try:
+            tat = await self._clamp(key, now, limit)
+            wait = tat + limit.interval - now - limit.period
+            if wait > 0:
+                return wait
+            spent = await self.collection.update_one(
+                {"_id": key, "tat": {"$lte": now + limit.period - limit.interval}},
+                {"$inc": {"tat": limit.interval}},
+            )
+        except PyMongoError as e:
+            logger.warning("Rate limit check failed open for %s: %s", key, e)
+            return 0.0
+        return 0.0 if spent.modified_count else limit.interval
+
+
+class ConcurrencyLimiter:
+    """Caps how many heavy requests run at once; the rest get a 503 straight away."""
+
+    def __init__(self, limit: int = HEAVY_ROUTE_CONCURRENCY):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.limit:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+
+def get_buckets(backend: str = RATE_LIMIT_BACKEND):
+    if backend == "mongo":
+        return MongoBuckets()
+    if backend == "memory":
+        return MemoryBuckets()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {backend!r}")
+
+
+def client_key(scope, limit: RateLimit) -> str:
+    """The user id from a valid bearer token for per-user limits, else the client ip.
+
+    Behind a proxy the ip is the caller's only when uvicorn runs with
+    --proxy-headers and FORWARDED_ALLOW_IPS covers the proxy, as the
+    Dockerfile sets up; otherwise every client shares the proxy's buckets.
+    """
+    if limit.key == "user":
+        authorization = Headers(scope=scope).get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            payload = decode_access_token(authorization[7:])
+            if payload and payload.get("id"):
+                return f"user:{payload['id']}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+def _retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+class RateLimitMiddleware:
+    """Per-client token buckets on the routes in RATE_LIMIT_ROUTES.
+
+    Over-limit requests get a 429, and heavy routes over the shared
+    concurrency cap get a 503, both with Retry-After. Requests are
+    rejected before their body is read, so a flood of uploads costs nothing.
+    """
+
+    def __init__(self, app, routes: dict = None, buckets=None, concurrency: ConcurrencyLimiter = None):
+        self.app = app
+        self.routes = sorted(
+            ((key, limit) for key, limit in (routes or {}).items() if limit is not None),
+            key=lambda item: len(item[0][1]), reverse=True,
+        )
+        self.buckets = buckets or get_buckets()
+        self.concurrency = concurrency or ConcurrencyLimiter()
+
+    def match(self, method: str, path: str):
+        for (route_method, prefix), limit in self.routes:
+            if method == route_method and path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self.match(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self.buckets.acquire(f"{limit.name}:{client_key(scope, limit)}", limit)
+        if wait > 0:
+            response = FastJSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, please slow down"},
+                headers={"Retry-After": _retry_after(wait)},
+            )
+            await response(scope, receive, send)
+            return
+
+        if not limit.heavy:
+            await self.app(scope, receive, send)
+            return
+        if not self.concurrency.try_acquire():
+            response = FastJSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry shortly"},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release()
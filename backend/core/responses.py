@@ -0,0 +1,57 @@
+from decimal import Decimal
+import orjson
+from bson import ObjectId, Decimal128
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return float(obj.to_decimal())
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; understands ObjectId and datetime.
+
+    Returning one of these from a route also skips FastAPI's jsonable_encoder
+    and response_model validation, so only use it for data built by our own
+    helpers.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# Elements are buffered into chunks of about this size, so a long stream
+# isn't one tiny send (and one compressor flush) per element
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+async def _json_array(items, chunk_size: int = STREAM_CHUNK_SIZE):
+    buffer = bytearray()
+    first = True
+    async for item in items:
+        buffer += b"[" if first else b","
+        buffer += dumps(item)
+        first = False
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    yield bytes(buffer) + (b"[]" if first else b"]")
+
+
+def stream_json_array(items, status_code: int = 200, headers: dict = None) -> StreamingResponse:
+    """Stream an async iterable of dicts as a JSON array, in chunks of about STREAM_CHUNK_SIZE."""
+    return StreamingResponse(
+        _json_array(items), status_code=status_code, headers=headers, media_type="application/json"
+    )
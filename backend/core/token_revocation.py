@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+from jose import jwt, JWTError
+from pymongo.errors import DuplicateKeyError
+from core.database import db
+
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", "5"))
+# Re-read a little history on every sync so clock skew between workers can't hide a revocation
+SYNC_OVERLAP = timedelta(seconds=30)
+# Kept for a pre-jti revocation whose token no longer decodes; matches create_access_token's default lifetime
+LEGACY_TOKEN_LIFETIME = timedelta(hours=12)
+
+
+def token_key(payload: dict, token: str) -> str:
+    # Tokens issued before jti was added are keyed by a digest, never the raw token
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationStore:
+    """Revoked token ids, mirrored in memory from `blacklisted_tokens`.
+
+    Checks are answered from the local set; the collection is only read
+    (incrementally, by `revoked_at`) once the mirror is older than the sync
+    interval. Entries expire in Mongo via the TTL index on `expires_at`
+    declared in core/indexes.py.
+    """
+
+    def __init__(self, sync_interval: float = REVOCATION_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self._revoked = {}
+        self._synced_at = None
+        self._last_revoked_at = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_interval
+
+    async def sync(self):
+        query = {}
+        if self._last_revoked_at is not None:
+            query = {"revoked_at": {"$gt": self._last_revoked_at - SYNC_OVERLAP}}
+
+        async for doc in db.blacklisted_tokens.find(query):
+            key = doc.get("jti") or hashlib.sha256(doc["token"].encode()).hexdigest()
+            self._revoked[key] = doc.get("expires_at")
+            revoked_at = doc.get("revoked_at")
+            if revoked_at and (self._last_revoked_at is None or revoked_at > self._last_revoked_at):
+                self._last_revoked_at = revoked_at
+
+        now = datetime.utcnow()
+        self._revoked = {
+            key: expires_at for key, expires_at in self._revoked.items()
+            if expires_at is None or expires_at > now
+        }
+        if self._last_revoked_at is None:
+            self._last_revoked_at = now
+        self._synced_at = time.monotonic()
+
+    async def is_revoked(self, key: str) -> bool:
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    await self.sync()
+        return key in self._revoked
+
+    async def revoke(self, key: str, expires_at: datetime):
+        await db.blacklisted_tokens.update_one(
+            {"jti": key},
+            {"$set": {"expires_at": expires_at, "revoked_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        self._revoked[key] = expires_at
+
+
+revocation_store = RevocationStore()
+
+
+def _legacy_expiry(token: str, now: datetime) -> datetime:
+    try:
+        # The signature was checked when the token was revoked; only its expiry matters now
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        exp = None
+    return datetime.utcfromtimestamp(exp) if exp else now + LEGACY_TOKEN_LIFETIME
+
+
+async def migrate_legacy_tokens() -> int:
+    """Re-key pre-jti `{"token": <raw jwt>}` revocations by digest and give them an expiry.
+
+    Runs at startup. The raw token is dropped, and the TTL index can then expire
+    the entry; ones already past their `exp` are deleted outright.
+    """
+    now = datetime.utcnow()
+    migrated = 0
+    async for doc in db.blacklisted_tokens.find({"token": {"$exists": True}}):
+        expires_at = _legacy_expiry(doc["token"], now)
+        if expires_at <= now:
+            await db.blacklisted_tokens.delete_one({"_id": doc["_id"]})
+        else:
+            try:
+                await db.blacklisted_tokens.update_one(
+                    {"_id": doc["_id"]},
+                    {
+                        "$set": {
+                            "jti": hashlib.sha256(doc["token"].encode()).hexdigest(),
+                            "expires_at": expires_at,
+                            "revoked_at": doc.get("revoked_at") or now,
+                        },
+                        "$unset": {"token": ""},
+                    },
+                )
+            except DuplicateKeyError:
+                # Already revoked under its digest
+                await db.blacklisted_tokens.delete_one({"_id": doc["_id"]})
+        migrated += 1
+    return migrated
@@ -0,0 +1,227 @@
+import asyncio
+import io
+import os
+import time
+import uuid
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from core.image_variants import get_variant_generator
+from core.metrics import external_call
+from core.responses import FastJSONResponse
+
+UPLOAD_BACKEND = os.getenv("UPLOAD_BACKEND", "cloudinary")
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+# Whole multipart request on the image routes; checked while the body arrives, before form parsing
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(6 * UPLOAD_MAX_BYTES)))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+UPLOAD_LOCAL_DIR = os.getenv("UPLOAD_LOCAL_DIR", "uploads")
+UPLOAD_LOCAL_BASE_URL = os.getenv("UPLOAD_LOCAL_BASE_URL", "/uploads")
+# Artificial per-upload delay for the local backend, to mimic network time in benchmarks
+UPLOAD_LOCAL_LATENCY = float(os.getenv("UPLOAD_LOCAL_LATENCY", "0"))
+
+CHUNK_SIZE = 256 * 1024
+
+
+class CloudinaryBackend:
+    def upload(self, data: bytes, folder: str, filename: str = "") -> dict:
+        from core.cloudinary_config import cloudinary
+
+        with external_call("cloudinary", "upload"):
+            result = cloudinary.uploader.upload(io.BytesIO(data), folder=folder)
+        return {"url": result["secure_url"], "public_id": result["public_id"]}
+
+    def delete(self, public_id: str):
+        from core.cloudinary_config import cloudinary
+
+        with external_call("cloudinary", "destroy"):
+            cloudinary.uploader.destroy(public_id)
+
+
+class LocalBackend:
+    """Writes images to disk; a stand-in for Cloudinary in dev and benchmarks."""
+
+    def __init__(self, root: str = UPLOAD_LOCAL_DIR, base_url: str = UPLOAD_LOCAL_BASE_URL,
+                 latency: float = UPLOAD_LOCAL_LATENCY):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.latency = latency
+
+    def upload(self, data: bytes, folder: str, filename: str = "") -> dict:
+        if self.latency:
+            time.sleep(self.latency)
+        public_id = f"{folder}/{uuid.uuid4().hex}{os.path.splitext(filename)[1]}"
+        path = os.path.join(self.root, public_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return {"url": f"{self.base_url}/{public_id}", "public_id": public_id}
+
+    def delete(self, public_id: str):
+        try:
+            os.remove(os.path.join(self.root, public_id))
+        except FileNotFoundError:
+            pass
+
+
+def get_backend(name: str = UPLOAD_BACKEND):
+    if name == "local":
+        return LocalBackend()
+    return CloudinaryBackend()
+
+
+class UploadService:
+    """Uploads images off the event loop, several at a time.
+
+    Every image is stored alongside its resized variants. A batch either
+    succeeds as a whole or every image that did upload is deleted again
+    before the error is raised.
+    """
+
+    def __init__(self, backend, variants=None, max_bytes: int = UPLOAD_MAX_BYTES,
+                 concurrency: int = UPLOAD_CONCURRENCY):
+        self.backend = backend
+        self.variants = variants or get_variant_generator()
+        self.max_bytes = max_bytes
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _read(self, file: UploadFile) -> bytes:
+        if file.size is not None and file.size > self.max_bytes:
+            raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {self.max_bytes} byte limit")
+
+        # Starlette has already spooled the part by now; this enforces the per-file
+        # limit, while UploadSizeMiddleware bounds what the request may send at all
+        chunks, total = [], 0
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            total += len(chunk)
+            if total > self.max_bytes:
+                raise HTTPException(status_code=413, detail=f"{file.filename} exceeds the {self.max_bytes} byte limit")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def _store(self, data: bytes, folder: str, filename: str) -> dict:
+        # Decoding first means a file that isn't an image never reaches storage
+        size, variants = await asyncio.to_thread(self.variants.generate, data)
+        encoded = [variant.pop("data") for variant in variants]
+
+        # The original and every variant upload side by side
+        results = await asyncio.gather(
+            asyncio.to_thread(self.backend.upload, data, folder, filename),
+            *(
+                asyncio.to_thread(self.backend.upload, blob, f"{folder}/variants", f"{variant['name']}.{variant['format']}")
+                for variant, blob in zip(variants, encoded)
+            ),
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self.discard([r for r in results if not isinstance(r, BaseException)])
+            raise errors[0]
+
+        stored, *uploaded = results
+        stored["variants"] = [{**variant, **result} for variant, result in zip(variants, uploaded)]
+        if size:
+            stored["width"], stored["height"] = size
+        return stored
+
+    async def _upload(self, file: UploadFile, folder: str) -> dict:
+        data = await self._read(file)
+        async with self._semaphore:
+            return await self._store(data, folder, file.filename)
+
+    async def upload_many(self, files, folder: str) -> list:
+        files = [f for f in files or [] if f and f.filename]
+        results = await asyncio.gather(
+            *(self._upload(f, folder) for f in files), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self.discard([r for r in results if not isinstance(r, BaseException)])
+            error = errors[0]
+            if isinstance(error, HTTPException):
+                raise error
+            if isinstance(error, ValueError):
+                raise HTTPException(status_code=415, detail=str(error))
+            raise HTTPException(status_code=500, detail=f"Image upload failed: {str(error)}")
+        return results
+
+    async def upload_one(self, file: UploadFile, folder: str):
+        uploaded = await self.upload_many([file], folder)
+        return uploaded[0] if uploaded else None
+
+    async def discard(self, uploaded: list):
+        # Best-effort cleanup; a failed delete must not mask the original error
+        public_ids = [
+            public_id
+            for u in uploaded
+            for public_id in [u["public_id"]] + [v["public_id"] for v in u.get("variants", [])]
+        ]
+        await asyncio.gather(
+            *(asyncio.to_thread(self.backend.delete, public_id) for public_id in public_ids),
+            return_exceptions=True,
+        )
+
+
+upload_service = UploadService(get_backend())
+
+# Routes that accept image uploads, by path prefix
+UPLOAD_ROUTES = (
+    "/api/products/add-product",
+    "/api/products/update-product/",
+    "/api/category/add-category",
+    "/api/category/update-category/",
+)
+
+
+class UploadSizeMiddleware:
+    """413s an upload request larger than `max_bytes` before its form is parsed.
+
+    A declared Content-Length over the limit is refused without reading the
+    body; otherwise the body is counted as it streams in, and the request is
+    answered as soon as it passes the limit rather than after it is spooled.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_REQUEST_BYTES, routes=UPLOAD_ROUTES):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.routes = tuple(routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT") or not scope["path"].startswith(self.routes):
+            await self.app(scope, receive, send)
+            return
+
+        too_large = FastJSONResponse(status_code=413, content={"detail": f"Upload exceeds the {self.max_bytes} byte request limit"})
+        declared = Headers(scope=scope).get("content-length")
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        refused = False
+
+        async def limited_receive():
+            nonlocal received, refused
+            if refused:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Answer now and tell the app the client went away, so parsing stops here
+                    refused = True
+                    await too_large(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not refused:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not refused:
+                raise
@@ -1,8 +1,45 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+import os
 from routes import auth
-from routes import auth, products,categories,cart,order,wishlist,google_oauth,ai
-app = FastAPI()
+from routes import auth, products,categories,cart,order,wishlist,google_oauth,ai,health
+from core.upload_service import UPLOAD_BACKEND, UPLOAD_LOCAL_DIR, UPLOAD_LOCAL_BASE_URL, UploadSizeMiddleware
+from core.database import connection
+from core.indexes import ensure_indexes
+from controllers.ai_job_controller import fail_stale_jobs
+from core.token_revocation import migrate_legacy_tokens
+from core.responses import FastJSONResponse
+from core.compression import CompressionMiddleware, COMPRESSION_MIN_SIZE, COMPRESSION_ROUTES
+from core.metrics import MetricsMiddleware, monitor_event_loop, render_metrics
+from core.rate_limit import RateLimitMiddleware, RATE_LIMIT_ENABLED, RATE_LIMIT_ROUTES
+
+# When set, /metrics requires "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connection.connect()
+    await ensure_indexes()
+    await fail_stale_jobs()
+    await migrate_legacy_tokens()
+    loop_monitor = asyncio.create_task(monitor_event_loop())
+    yield
+    loop_monitor.cancel()
+    connection.close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Innermost, so 429/503 rejections still carry CORS headers and show up in the metrics
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, routes=RATE_LIMIT_ROUTES)
+
+# Oversized uploads are refused while their body streams in, before the form is spooled
+app.add_middleware(UploadSizeMiddleware)
 
 # Allow frontend requests (Vercel)
 origins = [
@@ -15,7 +52,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE, routes=COMPRESSION_ROUTES)
+# Outermost, so the timings include compression and CORS
+app.add_middleware(MetricsMiddleware)
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(products.router, prefix="/api/products", tags=["Products"])
 app.include_router(categories.router, prefix="/api/category", tags=["Category"])
@@ -24,6 +65,20 @@ app.include_router(order.router)
 app.include_router(wishlist.router)
 app.include_router(google_oauth.router)
 app.include_router(ai.router, prefix="/api/ai")
+app.include_router(health.router)
+
+# Serve images written by the local upload backend (dev / benchmarks only)
+if UPLOAD_BACKEND == "local":
+    os.makedirs(UPLOAD_LOCAL_DIR, exist_ok=True)
+    app.mount(UPLOAD_LOCAL_BASE_URL, StaticFiles(directory=UPLOAD_LOCAL_DIR), name="uploads")
+
 @app.get("/")
 def read_root():
     return {"message": "SMF Jewels Backend Running!"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
@@ -1,14 +1,14 @@
-from core.database import db
-from bson import ObjectId
+from core.category_cache import category_cache
 def category_helper(category) -> dict:
     return {
         "id": str(category["_id"]),
         "name": category["name"],
         "slug": category["slug"],
         "image": category.get("image", None),
+        "thumbnail": category.get("thumbnail", None),
     }
 async def get_category_by_id(category_id: str):
-    category = await db.categories.find_one({"_id": ObjectId(category_id)})
+    category = await category_cache.get_by_id(category_id)
     if category:
         return {
             "id": str(category["_id"]),
@@ -1,8 +1,16 @@
-async def order_helper(order) -> dict:
+def order_helper(order) -> dict:
     return {
         "id": str(order["_id"]),
         "user_id": str(order["user_id"]),
-        "items": [{"product_id": str(i["product_id"]), "quantity": i["quantity"]} for i in order["items"]],
+        "items": [
+            {
+                "product_id": str(i["product_id"]),
+                "name": i["name"],
+                "quantity": i["quantity"],
+                "price": i["price"]
+            }
+            for i in order["items"]
+        ],
         "shipping_address": order["shipping_address"],
         "total_price": order["total_price"],
         "status": order["status"],
@@ -43,5 +43,21 @@ def product_helper(product) -> dict:
         "dimensions": product.get("dimensions", ""),
         "featured": product.get("featured", False),
         "images": product.get("images", []),
+        "image_variants": product.get("image_variants", []),
         "created_at": product.get("created_at")
     }
+
+def product_listing_helper(product) -> dict:
+    # Listing cards only need the first image's thumbnail
+    listing = product_helper(product)
+    listing.pop("image_variants")
+    if product.get("thumbnail"):
+        listing["images"] = [product["thumbnail"]]
+    return listing
+
+def thumbnail_images(product: dict) -> dict:
+    """Swap a projected product's `images` for its thumbnail when it has one."""
+    thumbnail = product.pop("thumbnail", None)
+    if thumbnail:
+        product["images"] = [thumbnail]
+    return product
@@ -1,41 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
+from typing import List, Optional
 from core.deps import is_admin
-import google.generativeai as genai
-import os
+from controllers.ai_controller import description_service
+from controllers.ai_job_controller import submit_job, get_job, list_jobs
+import asyncio
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class DescriptionRequest(BaseModel):
     productName: str
     category: str = "jewelry"
 
+class DescriptionJobRequest(BaseModel):
+    category: Optional[str] = None
+    product_ids: Optional[List[str]] = None
+    include_short_description: bool = False
+    overwrite: bool = False
+
 @router.post("/generate-description")
 async def generate_description(data: DescriptionRequest, user=Depends(is_admin)):
     try:
-        # Load API Key
-        api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="Google Gemini API key is missing")
-
-        genai.configure(api_key=api_key)
-
-        # *** CHANGE THIS LINE ***
-        model = genai.GenerativeModel("gemini-1.5-flash-latest") 
-        # **********************
-
-        prompt = (
-            f"Write a compelling and elegant product description for a {data.category} product "
-            f"named '{data.productName}' that will be used in an eCommerce website. "
-            "Keep it within 2-4 sentences and use persuasive language."
-        )
-
-        response = model.generate_content(prompt)
-        description = response.text.strip()
-
-        return {"description": description}
+        description, cached = await description_service.generate(data.productName, data.category)
+        return {"description": description, "cached": cached}
 
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="AI generation timed out")
     except Exception as e:
-        # Add more specific logging for debugging
-        print(f"AI generation failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
\ No newline at end of file
+        logger.exception("AI generation failed")
+        raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
+
+# ✅ Cache / coalescing counters (Admin only)
+@router.get("/stats")
+async def ai_stats(user=Depends(is_admin)):
+    return description_service.stats()
+
+# ✅ Backfill descriptions in the background (Admin only)
+@router.post("/jobs", status_code=202)
+async def create_description_job(data: DescriptionJobRequest, user=Depends(is_admin)):
+    return await submit_job(data.dict(exclude_none=True), user["id"])
+
+@router.get("/jobs")
+async def get_description_jobs(limit: int = Query(20, ge=1, le=100), user=Depends(is_admin)):
+    return await list_jobs(limit)
+
+@router.get("/jobs/{job_id}")
+async def get_description_job(job_id: str, user=Depends(is_admin)):
+    job = await get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
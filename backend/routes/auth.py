@@ -1,21 +1,14 @@
 from fastapi import APIRouter, HTTPException,Depends,Request
 from core.database import db
 from schemas.user_schema import UserCreate, UserResponse,UserLogin
-from controllers.auth_controller import hash_password
-from core.jwt_handler import create_access_token
+from controllers.auth_controller import hash_password, verify_password
+from core.jwt_handler import create_access_token, blacklist_token
 from models.user_model import user_helper
 from datetime import datetime
-from passlib.context import CryptContext
+from pymongo.errors import DuplicateKeyError
 from core.deps import get_current_user
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain, hashed):
-    return pwd_context.verify(plain, hashed)
-
-
 @router.post("/signup", response_model=UserResponse)
 async def signup(user: UserCreate):
     existing = await db.users.find_one({"email": user.email})
@@ -25,19 +18,22 @@ async def signup(user: UserCreate):
     new_user = {
         "name": user.name,
         "email": user.email,
-        "password": hash_password(user.password),
+        "password": await hash_password(user.password),
         "role": "user",
         "created_at": datetime.utcnow()
     }
 
-    result = await db.users.insert_one(new_user)
-    created_user = await db.users.find_one({"_id": result.inserted_id})
-    return user_helper(created_user)
+    # The read above spares bcrypt for known emails; the unique index catches concurrent signups
+    try:
+        await db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already exists")
+    return user_helper(new_user)
 
 @router.post("/login")
 async def login(form_data: UserLogin):
     user = await db.users.find_one({"email": form_data.email})
-    if not user or not verify_password(form_data.password, user["password"]):
+    if not user or not await verify_password(form_data.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     role = user.get("role", "user")
@@ -62,10 +58,6 @@ async def logout(request: Request, user=Depends(get_current_user)):
         raise HTTPException(status_code=400, detail="Invalid Authorization header")
 
     token = auth_header.split(" ")[1]
-
-    # Check if already blacklisted
-    exists = await db.blacklisted_tokens.find_one({"token": token})
-    if not exists:
-        await db.blacklisted_tokens.insert_one({"token": token})
+    await blacklist_token(user, token)
 
     return {"message": "Logout successful"}
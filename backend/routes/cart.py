@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from schemas.cart_schema import AddCartItem, UpdateCartItem
 from controllers.cart_controller import *
 from core.deps import get_current_user
@@ -13,28 +13,40 @@ def block_admin(user):
 
 
 @router.get("/get-cart")
-async def get_cart(user: dict = Depends(get_current_user)):
+async def get_cart(request: Request, response: Response, user: dict = Depends(get_current_user)):
     block_admin(user)
-    return await get_user_cart(user["id"])
+    items = await get_user_cart(user["id"])
+    etag = f'"{cart_version(items)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return items
 
 
+# Mutations return the changed line plus totals instead of the whole cart
 @router.post("/")
-async def add_item(data: AddCartItem, user: dict = Depends(get_current_user)):
+async def add_item(data: AddCartItem, response: Response, user: dict = Depends(get_current_user)):
     block_admin(user)
-    await add_to_cart(user["id"], data.dict())
-    return await get_user_cart(user["id"])
+    line = await add_to_cart(user["id"], data.dict())
+    summary = await cart_summary(user["id"], item=line)
+    response.headers["ETag"] = f'"{summary["version"]}"'
+    return summary
 
 
 @router.put("/update-cart/{product_id}")
-async def update_item(product_id: str, data: UpdateCartItem, user: dict = Depends(get_current_user)):
+async def update_item(product_id: str, data: UpdateCartItem, response: Response, user: dict = Depends(get_current_user)):
     block_admin(user)
-    await update_cart_item(user["id"], product_id, data.quantity)
-    return await get_user_cart(user["id"])
+    line = await update_cart_item(user["id"], product_id, data.quantity)
+    summary = await cart_summary(user["id"], item=line)
+    response.headers["ETag"] = f'"{summary["version"]}"'
+    return summary
 
 @router.delete("/remove-from-cart/{product_id}")
-async def delete_item(product_id: str, user: dict = Depends(get_current_user)):
+async def delete_item(product_id: str, response: Response, user: dict = Depends(get_current_user)):
     block_admin(user)
     await remove_from_cart(user["id"], product_id)
-    return await get_user_cart(user["id"])
+    summary = await cart_summary(user["id"], removed=product_id)
+    response.headers["ETag"] = f'"{summary["version"]}"'
+    return summary
 
 
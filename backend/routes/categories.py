@@ -1,21 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends,UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends,UploadFile, File, Form, Request
 from core.database import db
+from core.category_cache import category_cache
 from models.category_model import category_helper
 from schemas.category_schema import CategoryCreate, CategoryResponse
 from typing import List
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from core.deps import is_admin
-from core.cloudinary_config import cloudinary
+from core.upload_service import upload_service
+from core.image_variants import image_record, thumbnail_url
+from core.responses import FastJSONResponse
+from core.catalog_version import catalog_version, catalog_etag, cache_headers, not_modified
 
 router = APIRouter()
 
 # ✅ Get All Categories
 @router.get("/all-categories", response_model=List[CategoryResponse])
-async def get_all_categories():
-    categories = []
-    async for cat in db.categories.find():
-        categories.append(category_helper(cat))
-    return categories
+async def get_all_categories(request: Request):
+    etag = await catalog_etag("categories")
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    categories = [category_helper(cat) for cat in await category_cache.all()]
+    return FastJSONResponse(categories, headers=cache_headers(etag))
+
+# ✅ Category cache counters (Admin only)
+@router.get("/cache-stats")
+async def category_cache_stats(user=Depends(is_admin)):
+    return category_cache.stats()
 
 # ✅ Create Category (Admin only)
 @router.post("/add-category", response_model=CategoryResponse)
@@ -25,30 +38,30 @@ async def add_category(
     image: UploadFile = File(None),
     user=Depends(is_admin)
 ):
-    # Check if slug already exists
-    existing = await db.categories.find_one({"slug": slug})
-    if existing:
+    # Check the cache first so a taken slug doesn't cost an upload; the unique index settles races
+    if await category_cache.get_by_slug(slug):
         raise HTTPException(status_code=400, detail="Slug already exists")
 
-    image_url = None
-
-    # ✅ Upload to Cloudinary if image provided
-    if image:
-        try:
-            upload_result = cloudinary.uploader.upload(image.file, folder="categories")
-            image_url = upload_result["secure_url"]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+    # ✅ Upload image (off the event loop) if provided
+    uploaded = await upload_service.upload_one(image, folder="categories")
+    record = image_record(uploaded) if uploaded else None
 
     new_cat = {
         "name": name,
         "slug": slug,
-        "image": image_url,
+        "image": record["url"] if record else None,
+        "image_variants": [record] if record else [],
+        "thumbnail": thumbnail_url(record) if record else None,
     }
 
-    result = await db.categories.insert_one(new_cat)
-    cat = await db.categories.find_one({"_id": result.inserted_id})
-    return category_helper(cat)
+    try:
+        await db.categories.insert_one(new_cat)
+    except DuplicateKeyError:
+        await upload_service.discard([uploaded] if uploaded else [])
+        raise HTTPException(status_code=400, detail="Slug already exists")
+    category_cache.put(new_cat)
+    await catalog_version.bump()
+    return category_helper(new_cat)
 
 # ✅ Delete Category (Admin only)
 @router.delete("/delete-category/{category_id}")
@@ -56,6 +69,8 @@ async def delete_category(category_id: str, user=Depends(is_admin)):
     deleted = await db.categories.delete_one({"_id": ObjectId(category_id)})
     if not deleted.deleted_count:
         raise HTTPException(status_code=404, detail="Category not found")
+    await category_cache.refresh()
+    await catalog_version.bump()
     return {"message": "Category deleted"}
 # ✅ Update Category (Admin only)
 @router.put("/update-category/{category_id}", response_model=CategoryResponse)
@@ -67,44 +82,61 @@ async def update_category(
     image_url_existing: str = Form(None),
     user=Depends(is_admin)
 ):
-    existing = await db.categories.find_one({"_id": ObjectId(category_id)})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Category not found")
-
-    image_url = existing.get("image")
+    if not ObjectId.is_valid(category_id):
+        raise HTTPException(status_code=400, detail="Invalid category ID")
 
     # ✅ Upload new image if provided
-    if image:
-        try:
-            upload_result = cloudinary.uploader.upload(image.file, folder="categories")
-            image_url = upload_result["secure_url"]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
-    elif image_url_existing:
-        image_url = image_url_existing
+    uploaded = await upload_service.upload_one(image, folder="categories")
+    if uploaded:
+        record = image_record(uploaded)
+        image_fields = {
+            "image": {"$literal": uploaded["url"]},
+            "image_variants": {"$literal": [record]},
+            "thumbnail": {"$literal": thumbnail_url(record)},
+        }
+    else:
+        # Keep the stored record of the image still shown, read in the same atomic
+        # update so another admin's image change can't be undone by a stale copy
+        image_url = {"$literal": image_url_existing} if image_url_existing else {"$ifNull": ["$image", None]}
+        image_fields = {
+            "image": image_url,
+            "image_variants": {"$filter": {
+                "input": {"$ifNull": ["$image_variants", []]},
+                "cond": {"$eq": ["$$this.url", image_url]},
+            }},
+            "thumbnail": {"$cond": [{"$eq": ["$image", image_url]}, {"$ifNull": ["$thumbnail", None]}, None]},
+        }
 
-    update_data = {
-        "name": name,
-        "slug": slug,
-        "image": image_url,
-    }
-
-    await db.categories.update_one(
-        {"_id": ObjectId(category_id)},
-        {"$set": update_data}
-    )
+    try:
+        updated_cat = await db.categories.find_one_and_update(
+            {"_id": ObjectId(category_id)},
+            [{"$set": {"name": {"$literal": name}, "slug": {"$literal": slug}, **image_fields}}],
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        await upload_service.discard([uploaded] if uploaded else [])
+        raise HTTPException(status_code=400, detail="Slug already exists")
+    if not updated_cat:
+        await upload_service.discard([uploaded] if uploaded else [])
+        raise HTTPException(status_code=404, detail="Category not found")
 
-    updated_cat = await db.categories.find_one({"_id": ObjectId(category_id)})
+    category_cache.put(updated_cat)
+    await catalog_version.bump()
     return category_helper(updated_cat)
 
 # ✅ Get Category by ID
 @router.get("/single-category/{category_id}", response_model=CategoryResponse)
-async def get_category_by_id(category_id: str):
+async def get_category_by_id(category_id: str, request: Request):
     if not ObjectId.is_valid(category_id):
         raise HTTPException(status_code=400, detail="Invalid category ID")
+
+    etag = await catalog_etag("category", category_id)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    category = await db.categories.find_one({"_id": ObjectId(category_id)})
+    category = await category_cache.get_by_id(category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    return category_helper(category)
\ No newline at end of file
+    return FastJSONResponse(category_helper(category), headers=cache_headers(etag))
\ No newline at end of file
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import RedirectResponse
 from authlib.integrations.starlette_client import OAuth
+from pymongo.errors import DuplicateKeyError
 import os
 
 router = APIRouter()
@@ -28,14 +29,19 @@ async def google_callback(request: Request):
     from core.database import db
     users_collection = db["users"]
 
-    existing_user = await users_collection.find_one({"email": user_info['email']})
-    if not existing_user:
-        await users_collection.insert_one({
-            "name": user_info['name'],
-            "email": user_info['email'],
-            "picture": user_info['picture'],
-            "is_google": True
-        })
+    # Upsert on the unique email index: one round trip, and no duplicate on concurrent callbacks
+    try:
+        await users_collection.update_one(
+            {"email": user_info['email']},
+            {"$setOnInsert": {
+                "name": user_info['name'],
+                "picture": user_info['picture'],
+                "is_google": True
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        pass  # created by a concurrent callback
 
     # Generate your JWT token logic here (optional)
     return RedirectResponse(url="http://localhost:3000")  # or your frontend URL
@@ -0,0 +1,29 @@
+import time
+from fastapi import APIRouter
+from core.database import client, pool_listener, MONGO_CATALOG_READ_PREFERENCE
+from core.responses import FastJSONResponse
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+# ✅ Liveness: the process is up and serving, no dependencies checked
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+# ✅ Readiness: Mongo answers a ping; 503 tells the load balancer to stop routing here
+@router.get("/ready")
+async def ready():
+    start = time.perf_counter()
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        return FastJSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "error": str(e), "pool": pool_listener.snapshot()},
+        )
+    return {
+        "status": "ok",
+        "ping_ms": round((time.perf_counter() - start) * 1000, 2),
+        "pool": pool_listener.snapshot(),
+        "catalog_read_preference": MONGO_CATALOG_READ_PREFERENCE,
+    }
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from schemas.order_schema import CreateOrder, OrderResponse
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from controllers.order_controller import *
 from core.deps import get_current_user, is_admin
+from core.responses import FastJSONResponse, stream_json_array
 
 router = APIRouter(prefix="/api/orders", tags=["Orders"])
 
@@ -14,12 +17,58 @@ async def create_order(data: CreateOrder, user: dict = Depends(get_current_user)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/all-orders", response_model=List[OrderResponse])
-async def user_orders(user: dict = Depends(get_current_user)):
-    return await get_user_orders(user["id"])
+async def user_orders(
+    limit: Optional[int] = Query(None, gt=0, le=MAX_ORDER_PAGE_SIZE),
+    after: Optional[str] = None,
+    user: dict = Depends(get_current_user)
+):
+    try:
+        # Without a limit every order is returned, as before pagination, but streamed
+        if limit is None:
+            return stream_json_array(iter_orders(order_filter(user_id=user["id"], after=after)))
+        orders, next_cursor = await get_user_orders(user["id"], limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(orders, headers=headers)
 
 @router.get("/all-users-orders", response_model=List[OrderResponse])
-async def admin_orders(_: dict = Depends(is_admin)):
-    return await get_all_orders()
+async def admin_orders(
+    limit: Optional[int] = Query(None, gt=0, le=MAX_ORDER_PAGE_SIZE),
+    after: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    _: dict = Depends(is_admin)
+):
+    try:
+        if limit is None:
+            return stream_json_array(iter_orders(order_filter(
+                status=status, date_from=date_from, date_to=date_to, after=after
+            )))
+        orders, next_cursor = await get_all_orders(
+            limit=limit, after=after, status=status, date_from=date_from, date_to=date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(orders, headers=headers)
+
+# ✅ Stream every matching order as NDJSON or CSV (Admin only)
+@router.get("/export")
+async def export_all_orders(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    _: dict = Depends(is_admin)
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_orders(format, status=status, date_from=date_from, date_to=date_to),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
 
 @router.put("/{order_id}/status")
 async def update_status(order_id: str, status: str, _: dict = Depends(is_admin)):
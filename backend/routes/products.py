@@ -1,16 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends,Form, File, UploadFile
-from schemas.product_schema import ProductCreate, ProductResponse
+from fastapi import APIRouter, HTTPException, Depends,Form, File, UploadFile, Query, Request
+from schemas.product_schema import ProductCreate, ProductResponse, InventorySync
 from controllers.product_controller import (
-    create_product, update_product, delete_product,
-    get_all_products, get_product_by_id
+    create_product, update_product, delete_product, product_images, existing_image_records,
+    list_products, iter_products, product_query, get_product_by_id, MAX_PAGE_SIZE
 )
-from bson import ObjectId
+from controllers.import_controller import import_products
+from controllers.inventory_controller import sync_inventory, INVENTORY_MAX_BATCH
+from controllers.search_controller import search_products, MAX_SEARCH_LIMIT
 from typing import List, Optional
-from core.database import db
 from models.product_model import product_helper
 from models.category_model import get_category_by_id 
 from core.deps import is_admin
-from core.cloudinary_config import cloudinary
+from core.upload_service import upload_service
+from core.image_variants import image_record
+from core.responses import FastJSONResponse, stream_json_array
+from core.catalog_version import catalog_version, catalog_etag, cache_headers, not_modified
 
 router = APIRouter()
 
@@ -31,15 +35,9 @@ async def add_product(
     images: Optional[List[UploadFile]] = File(None),
     user=Depends(is_admin)
 ):
-    # Upload all images to Cloudinary
-    image_urls = []
-    if images:
-        for image in images:
-            try:
-                result = cloudinary.uploader.upload(image.file, folder="products")
-                image_urls.append(result["secure_url"])
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+    # Upload all images concurrently; a failure rolls the whole batch back
+    uploaded = await upload_service.upload_many(images, folder="products")
+    image_urls = [u["url"] for u in uploaded]
 
     # Build product dict
     product_data = {
@@ -53,13 +51,36 @@ async def add_product(
         "weight": weight,
         "dimensions": dimensions,
         "featured": featured,
-        "images": image_urls
+        **product_images(image_urls, [image_record(u) for u in uploaded]),
     }
 
     # Save to DB
-    new_product = await create_product(product_data)
+    try:
+        new_product = await create_product(product_data)
+    except Exception:
+        await upload_service.discard(uploaded)
+        raise
     return new_product
 
+# ✅ Bulk import from CSV / NDJSON, upserting by sku (Admin Only)
+@router.post("/import")
+async def import_products_route(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    user=Depends(is_admin)
+):
+    if format is None:
+        name = (file.filename or "").lower()
+        format = "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv"
+    return await import_products(file.file, format)
+
+# ✅ Bulk stock / price sync (Admin Only)
+@router.post("/inventory")
+async def inventory_sync_route(data: InventorySync, user=Depends(is_admin)):
+    if len(data.items) > INVENTORY_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {INVENTORY_MAX_BATCH} items per batch")
+    return await sync_inventory(data.items)
+
 @router.put("/update-product/{product_id}", response_model=ProductResponse)
 async def update_product_route(
     product_id: str,
@@ -79,15 +100,12 @@ async def update_product_route(
 ):
     # Parse existing image URLs
     image_urls = [url for url in existing_images.split(",") if url.strip()]
+    records = await existing_image_records(product_id) if image_urls else []
 
-    # Upload new images to Cloudinary
-    if images:
-        for image in images:
-            try:
-                result = cloudinary.uploader.upload(image.file, folder="products")
-                image_urls.append(result["secure_url"])
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Image upload failed: {str(e)}")
+    # Upload new images concurrently; a failure rolls the whole batch back
+    uploaded = await upload_service.upload_many(images, folder="products")
+    image_urls += [u["url"] for u in uploaded]
+    records += [image_record(u) for u in uploaded]
 
     # Update the product
     updated_data = {
@@ -101,24 +119,22 @@ async def update_product_route(
         "weight": weight,
         "dimensions": dimensions,
         "featured": featured,
-        "images": image_urls,
+        **product_images(image_urls, records),
     }
 
-    updated = await update_product(product_id, updated_data)
+    try:
+        updated = await update_product(product_id, updated_data)
+    except Exception:
+        await upload_service.discard(uploaded)
+        raise
 
     if not updated:
+        await upload_service.discard(uploaded)
         raise HTTPException(status_code=404, detail="Product not found")
 
-    # 🔁 Re-fetch the updated product to include full category object
-    updated_product = await get_product_by_id(product_id)
-    if not updated_product:
-        raise HTTPException(status_code=404, detail="Failed to fetch updated product")
-
-    # 🔍 Replace category ID with full category object
-    category_obj = await get_category_by_id(updated_product["category"])
-    updated_product["category"] = category_obj
-
-    return updated_product
+    # 🔍 The update already returned the new document; the category comes from the in-memory cache
+    updated["category"] = await get_category_by_id(updated["category"])
+    return updated
 
 # ✅ DELETE /products/{id} 
 @router.delete("/delete-product/{product_id}")
@@ -131,35 +147,68 @@ async def delete(product_id: str, user=Depends(is_admin)):
 
 
 @router.get("/all")
-async def list_products():
-    products = await db.products.find().to_list(length=None)
-
-    formatted_products = []
-
-    for product in products:
-        if "_id" not in product:
-            print("⚠️ Skipped product (missing _id):", product)
-            continue
-
-        # Replace category ID with full category object
-        category_id = product.get("category")
-        if category_id:
-            try:
-                category = await db.categories.find_one({"_id": ObjectId(category_id)})
-                if category:
-                    product["category"] = category
-            except Exception as e:
-                print("⚠️ Failed to fetch category:", e)
-
-        formatted_products.append(product_helper(product))
+async def list_products_route(
+    request: Request,
+    limit: Optional[int] = Query(None, gt=0, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+):
+    # Unchanged catalog since the client's copy: answer 304 without touching Mongo
+    etag = await catalog_etag("products", limit, after)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    headers = cache_headers(etag)
+
+    try:
+        # Without a limit the whole catalog is streamed element by element
+        if limit is None:
+            return stream_json_array(iter_products(product_query(after)), headers=headers)
+        products, next_cursor = await list_products(limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Keep the body a plain list for existing clients; the cursor rides in a header
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return FastJSONResponse(products, headers=headers)
+
+# ✅ Full-text search with filters and facet counts
+@router.get("/search")
+async def search(
+    request: Request,
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    featured: Optional[bool] = None,
+    in_stock: Optional[bool] = None,
+    sort: str = Query("relevance", pattern="^(relevance|price_asc|price_desc|newest)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(24, gt=0, le=MAX_SEARCH_LIMIT),
+):
+    etag = await catalog_etag("search", sorted(request.query_params.multi_items()))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
 
-    return formatted_products
+    results = await search_products(
+        q=q, category=category, min_price=min_price, max_price=max_price,
+        featured=featured, in_stock=in_stock, sort=sort, skip=skip, limit=limit
+    )
+    return FastJSONResponse(results, headers=cache_headers(etag))
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def view_product(product_id: str):
-    print("Received product_id:", product_id)  # Or use logger.info
+async def view_product(product_id: str, request: Request):
+    # Taken before the read, so a version bumped meanwhile can't label the older body
+    token = await catalog_version.current()
     product = await get_product_by_id(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product_helper(product)
+
+    # Checkouts don't bump the catalog version, so the live stock is part of the ETag
+    etag = await catalog_etag("product", product_id, product.get("stock"), token=token)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return FastJSONResponse(product_helper(product), headers=cache_headers(etag))
 
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
 from core.deps import get_current_user
 from controllers.wishlist_controller import *
 
 router = APIRouter(prefix="/api/wishlist", tags=["Wishlist"])
 
 @router.get("/")
-async def get_wishlist(user: dict = Depends(get_current_user)):
-    return await get_user_wishlist(user["id"])
+async def get_wishlist(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, gt=0, le=200),
+    user: dict = Depends(get_current_user),
+):
+    return await get_user_wishlist(user["id"], skip=skip, limit=limit)
 
 @router.post("/add-to-wishlist/{product_id}")
 async def add_to_user_wishlist(product_id: str, user: dict = Depends(get_current_user)):
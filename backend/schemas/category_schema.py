@@ -11,3 +11,4 @@ class CategoryResponse(BaseModel):
     name: str
     slug: str
     image: Optional[str] = None
+    thumbnail: Optional[str] = None
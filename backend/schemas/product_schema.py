@@ -19,6 +19,20 @@ class ProductCreate(BaseModel):
     featured: bool = False
     images: Optional[List[str]] = []
 
+class ProductImportRow(BaseModel):
+    """One import row; every field is optional so a row for an existing sku can update just a few."""
+    name: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[CategoryInfo] = None
+    description: Optional[str] = None
+    shortDescription: Optional[str] = None
+    sku: Optional[str] = None
+    stock: Optional[int] = None
+    weight: Optional[str] = None
+    dimensions: Optional[str] = None
+    featured: Optional[bool] = None
+    images: Optional[List[str]] = None
+
 class ProductResponse(BaseModel):
     name: str
     price: float
@@ -31,3 +45,16 @@ class ProductResponse(BaseModel):
     dimensions: Optional[str] = ""
     featured: bool = False
     images: Optional[List[str]] = []
+    image_variants: Optional[List[dict]] = []
+
+class InventoryItem(BaseModel):
+    id: Optional[str] = None
+    sku: Optional[str] = None
+    stock: Optional[int] = None        # absolute
+    stock_delta: Optional[int] = None  # relative; can't take stock below zero
+    price: Optional[float] = None
+    expected_stock: Optional[int] = None  # optimistic guards
+    expected_price: Optional[float] = None
+
+class InventorySync(BaseModel):
+    items: List[InventoryItem]
@@ -0,0 +1,70 @@
+"""Shared fixtures.
+
+Run from backend/ with `python -m pytest`. Tests use the MongoDB at
+MONGO_TEST_URI (database smf_jewels_test, dropped after each test), or an
+in-process fake when it is unset (needs `mongomock-motor`). Tests that
+depend on the real query planner are skipped on the fake.
+"""
+import os
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ["MONGO_DB_NAME"] = "smf_jewels_test"
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI")
+if MONGO_TEST_URI:
+    os.environ["MONGO_URI"] = MONGO_TEST_URI
+else:
+    import motor.motor_asyncio
+    from mongomock_motor import AsyncMongoMockClient
+    motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+requires_mongo = pytest.mark.skipif(not MONGO_TEST_URI, reason="needs a real MongoDB (set MONGO_TEST_URI)")
+
+
+def auth(role: str = "user", user_id=None) -> dict:
+    from bson import ObjectId
+    from core.jwt_handler import create_access_token
+
+    token = create_access_token({"id": str(user_id or ObjectId()), "email": f"{role}@example.com", "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _reset_process_caches():
+    from core.cart_cache import cart_cache
+    from core.catalog_version import catalog_version
+    from core.category_cache import category_cache
+    from core.token_revocation import revocation_store
+
+    # Module-level singletons would otherwise carry one test's data (and locks) into the next
+    for cache in (cart_cache, catalog_version, category_cache, revocation_store):
+        cache.__init__()
+
+
+@pytest.fixture
+async def db():
+    from core.database import connection, db, MONGO_DB_NAME
+
+    _reset_process_caches()
+    yield db
+    if MONGO_TEST_URI:
+        await connection.connect().drop_database(MONGO_DB_NAME)
+    # Each test runs on its own event loop, so it also gets its own client
+    connection.close()
+
+
+@pytest.fixture
+async def client(db):
+    import httpx
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
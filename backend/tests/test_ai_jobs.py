@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+import pytest
+from controllers import ai_job_controller
+from controllers.ai_controller import description_service, cache_key
+from controllers.ai_job_controller import _run_job, fail_stale_jobs, get_job
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        return f"Fresh description {self.calls}. Second sentence."
+
+
+@pytest.fixture
+def model(monkeypatch):
+    client = CountingClient()
+    monkeypatch.setattr(description_service, "client", client)
+    return client
+
+
+async def test_stale_jobs_are_failed_when_read(db, client):
+    stale = datetime.utcnow() - timedelta(seconds=ai_job_controller.AI_JOB_STALE_AFTER + 60)
+    dead = await db.ai_jobs.insert_one({
+        "status": "running", "filter": {}, "created_at": stale, "started_at": stale, "heartbeat_at": stale,
+    })
+    live = await db.ai_jobs.insert_one({
+        "status": "running", "filter": {}, "created_at": stale, "started_at": stale, "heartbeat_at": datetime.utcnow(),
+    })
+
+    response = await client.get(f"/api/ai/jobs/{dead.inserted_id}", headers=auth("admin"))
+    assert response.status_code == 200
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"]
+    assert (await get_job(str(live.inserted_id)))["status"] == "running"
+    assert await fail_stale_jobs() == 0
+
+
+async def test_overwrite_asks_the_model_again(db, model):
+    await db.products.insert_one({"name": "Halo Ring", "description": "Old copy."})
+    await db.ai_descriptions.insert_one({"_id": cache_key("Halo Ring", "jewelry"), "description": "Cached copy."})
+    job = await db.ai_jobs.insert_one({"status": "queued", "filter": {}, "created_at": datetime.utcnow()})
+
+    await _run_job(job.inserted_id, {"overwrite": True})
+
+    product = await db.products.find_one({"name": "Halo Ring"})
+    assert model.calls == 1
+    assert product["description"].startswith("Fresh description")
+
+
+async def test_cache_hits_skip_the_rate_limiter(db, model, monkeypatch):
+    waits = []
+
+    async def wait(self):
+        waits.append(1)
+
+    monkeypatch.setattr(ai_job_controller.RateLimiter, "wait", wait)
+    await db.products.insert_many([{"name": "Halo Ring"}, {"name": "Pearl Drop"}])
+    await db.ai_descriptions.insert_one({"_id": cache_key("Halo Ring", "jewelry"), "description": "Cached copy."})
+    job = await db.ai_jobs.insert_one({"status": "queued", "filter": {}, "created_at": datetime.utcnow()})
+
+    await _run_job(job.inserted_id, {})
+
+    assert model.calls == 1
+    assert len(waits) == 1
+    assert (await db.ai_jobs.find_one({"_id": job.inserted_id}))["succeeded"] == 2
@@ -0,0 +1,40 @@
+import hashlib
+from datetime import datetime, timedelta
+import pytest
+from core.jwt_handler import create_access_token
+from core.token_revocation import RevocationStore, migrate_legacy_tokens, revocation_store
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_logged_out_token_is_rejected(client, db):
+    headers = auth()
+    assert (await client.post("/api/auth/logout", headers=headers)).status_code == 200
+
+    again = await client.get("/api/cart/get-cart", headers=headers)
+    assert again.status_code == 401
+    assert again.json()["detail"] == "Token has been revoked (logged out)"
+
+
+async def test_revocation_reaches_other_workers(db):
+    other_worker = RevocationStore(sync_interval=0)
+    assert not await other_worker.is_revoked("jti-1")
+
+    await revocation_store.revoke("jti-1", datetime.utcnow() + timedelta(hours=1))
+    assert await other_worker.is_revoked("jti-1")
+
+
+async def test_legacy_raw_tokens_are_rekeyed_with_an_expiry(db):
+    live = create_access_token({"id": "u1"})
+    expired = create_access_token({"id": "u2"}, expires_delta=timedelta(hours=-1))
+    await db.blacklisted_tokens.insert_many([{"token": live}, {"token": expired}])
+
+    assert await migrate_legacy_tokens() == 2
+
+    docs = await db.blacklisted_tokens.find().to_list(length=None)
+    assert len(docs) == 1
+    assert "token" not in docs[0]
+    assert docs[0]["jti"] == hashlib.sha256(live.encode()).hexdigest()
+    assert docs[0]["expires_at"] > datetime.utcnow()
+    assert await RevocationStore(sync_interval=0).is_revoked(docs[0]["jti"])
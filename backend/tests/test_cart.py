@@ -0,0 +1,63 @@
+import pytest
+from bson import ObjectId
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = ObjectId()
+
+
+async def seed_products(db):
+    result = await db.products.insert_many([
+        {"name": "Solitaire Ring", "sku": "CART-1", "price": 100.0, "stock": 5},
+        {"name": "Pearl Drop", "sku": "CART-2", "price": 40.0, "stock": 5},
+    ])
+    return [str(i) for i in result.inserted_ids]
+
+
+async def test_add_update_and_remove_return_totals(client, db):
+    ring, pearl = await seed_products(db)
+    headers = auth(user_id=USER_ID)
+
+    added = await client.post("/api/cart/", json={"product_id": ring, "quantity": 2}, headers=headers)
+    assert added.status_code == 200
+    assert added.json()["totals"] == {"items": 1, "quantity": 2, "subtotal": 200.0}
+
+    await client.post("/api/cart/", json={"product_id": pearl, "quantity": 1}, headers=headers)
+    updated = await client.put(f"/api/cart/update-cart/{ring}", json={"quantity": 3}, headers=headers)
+    assert updated.json()["item"]["quantity"] == 3
+    assert updated.json()["totals"] == {"items": 2, "quantity": 4, "subtotal": 340.0}
+
+    removed = await client.delete(f"/api/cart/remove-from-cart/{pearl}", headers=headers)
+    assert removed.json()["removed"] == pearl
+    assert removed.json()["totals"] == {"items": 1, "quantity": 3, "subtotal": 300.0}
+
+    # The mutation's version is the ETag a full read of the same cart carries
+    cart = await client.get("/api/cart/get-cart", headers=headers)
+    assert cart.headers["etag"] == removed.headers["etag"]
+
+
+async def test_over_stock_is_rejected(client, db):
+    ring, _ = await seed_products(db)
+    headers = auth(user_id=USER_ID)
+
+    await client.post("/api/cart/", json={"product_id": ring, "quantity": 4}, headers=headers)
+    response = await client.post("/api/cart/", json={"product_id": ring, "quantity": 2}, headers=headers)
+    assert response.status_code == 400
+    assert (await db.cart_items.find_one({"user_id": USER_ID}))["quantity"] == 4
+
+
+async def test_write_on_another_worker_is_not_hidden_by_this_workers_cache(client, db):
+    ring, pearl = await seed_products(db)
+    headers = auth(user_id=USER_ID)
+    await client.post("/api/cart/", json={"product_id": ring, "quantity": 1}, headers=headers)
+    await client.get("/api/cart/get-cart", headers=headers)
+
+    # Another worker adds a line: it writes the item and bumps the revision
+    await db.cart_items.insert_one({"user_id": USER_ID, "product_id": ObjectId(pearl), "quantity": 2})
+    await db.cart_revisions.update_one({"_id": USER_ID}, {"$inc": {"revision": 1}})
+
+    response = await client.put(f"/api/cart/update-cart/{ring}", json={"quantity": 2}, headers=headers)
+    assert response.json()["totals"] == {"items": 2, "quantity": 4, "subtotal": 280.0}
+    cart = await client.get("/api/cart/get-cart", headers=headers)
+    assert cart.headers["etag"] == response.headers["etag"]
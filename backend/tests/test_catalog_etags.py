@@ -0,0 +1,72 @@
+import pytest
+import routes.products
+from bson import ObjectId
+from core.catalog_version import catalog_version
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = ObjectId()
+
+
+async def seed_product(db, stock: int = 5) -> ObjectId:
+    result = await db.products.insert_one({
+        "name": "Solitaire Ring", "price": 250.0, "category": "", "sku": "ETAG-1",
+        "stock": stock, "images": [], "featured": False,
+    })
+    return result.inserted_id
+
+
+async def test_checkout_keeps_listing_etags_but_refreshes_the_product(client, db):
+    product_id = await seed_product(db)
+    listing = await client.get("/api/products/all")
+    detail = await client.get(f"/api/products/{product_id}")
+
+    await db.cart_items.insert_one({"user_id": USER_ID, "product_id": product_id, "quantity": 2})
+    order = await client.post("/api/orders/place-order", json={"shipping_address": "1 Test Street"},
+                              headers=auth(user_id=USER_ID))
+    assert order.status_code == 200
+
+    again = await client.get("/api/products/all", headers={"If-None-Match": listing.headers["etag"]})
+    assert again.status_code == 304
+
+    fresh = await client.get(f"/api/products/{product_id}", headers={"If-None-Match": detail.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.json()["stock"] == 3
+
+
+async def test_admin_write_invalidates_listing_etag(client, db):
+    product_id = await seed_product(db)
+    listing = await client.get("/api/products/all")
+
+    response = await client.put(
+        f"/api/products/update-product/{product_id}",
+        data={"name": "Halo Ring", "price": 300, "category": "rings", "stock": 5, "sku": "ETAG-1"},
+        headers=auth("admin"),
+    )
+    assert response.status_code == 200
+
+    again = await client.get("/api/products/all", headers={"If-None-Match": listing.headers["etag"]})
+    assert again.status_code == 200
+
+
+async def test_product_etag_is_not_newer_than_its_body(client, db, monkeypatch):
+    product_id = await seed_product(db)
+    catalog_version.sync_interval = 0
+    read = routes.products.get_product_by_id
+
+    async def read_then_rename(pid):
+        # Another worker's admin edit lands between the read and the ETag
+        product = await read(pid)
+        await db.products.update_one({"_id": product_id}, {"$set": {"name": "Halo Ring"}})
+        await db.meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}})
+        return product
+
+    monkeypatch.setattr(routes.products, "get_product_by_id", read_then_rename)
+    stale = await client.get(f"/api/products/{product_id}")
+    assert stale.json()["name"] == "Solitaire Ring"
+    monkeypatch.undo()
+
+    fresh = await client.get(f"/api/products/{product_id}", headers={"If-None-Match": stale.headers["etag"]})
+    assert fresh.status_code == 200
+    assert fresh.json()["name"] == "Halo Ring"
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+import pytest
+from core import category_cache as category_cache_module
+from core.catalog_version import catalog_version
+from core.category_cache import CategoryCache
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_update_keeps_an_image_another_worker_just_set(client, db):
+    result = await db.categories.insert_one({"name": "Rings", "slug": "rings", "image": "https://cdn.example.com/a.jpg"})
+    assert (await client.get("/api/category/all-categories")).status_code == 200
+
+    # Another worker replaces the image; this worker's cache still holds the old one
+    record = {"url": "https://cdn.example.com/b.jpg", "public_id": "categories/b", "variants": []}
+    await db.categories.update_one({"_id": result.inserted_id}, {"$set": {"image": record["url"], "image_variants": [record]}})
+
+    response = await client.put(
+        f"/api/category/update-category/{result.inserted_id}",
+        data={"name": "Fine Rings", "slug": "rings"},
+        headers=auth("admin"),
+    )
+    assert response.status_code == 200
+    assert response.json()["image"] == record["url"]
+    assert (await db.categories.find_one({"_id": result.inserted_id}))["image_variants"] == [record]
+
+
+async def test_put_during_reload_forces_another_reload(db, monkeypatch):
+    cache = CategoryCache()
+    result = await db.categories.insert_one({"name": "Rings", "slug": "rings"})
+
+    class WriteDuringFind:
+        # A write lands after the reload's cursor has already read the old document
+        def find(self, *args, **kwargs):
+            cursor = db.categories.find(*args, **kwargs)
+            cache.put({"_id": result.inserted_id, "name": "Fine Rings", "slug": "rings"})
+            return cursor
+
+    monkeypatch.setattr(category_cache_module, "db", SimpleNamespace(categories=WriteDuringFind()))
+    await cache.refresh()
+    assert not cache._is_fresh()
+
+    monkeypatch.setattr(category_cache_module, "db", db)
+    await db.categories.update_one({"_id": result.inserted_id}, {"$set": {"name": "Fine Rings"}})
+    assert (await cache.get_by_slug("rings"))["name"] == "Fine Rings"
+
+
+async def test_category_write_on_another_worker_reloads_this_workers_cache(client, db):
+    await db.categories.insert_one({"name": "Rings", "slug": "rings"})
+    catalog_version.sync_interval = 0
+    first = await client.get("/api/category/all-categories")
+    assert [c["name"] for c in first.json()] == ["Rings"]
+
+    # Another worker adds a category and bumps the shared version
+    await db.categories.insert_one({"name": "Pendants", "slug": "pendants"})
+    await db.meta.update_one({"_id": "catalog"}, {"$inc": {"version": 1}})
+
+    second = await client.get("/api/category/all-categories", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert [c["name"] for c in second.json()] == ["Rings", "Pendants"]
+    again = await client.get("/api/category/all-categories", headers={"If-None-Match": second.headers["etag"]})
+    assert again.status_code == 304
@@ -0,0 +1,35 @@
+import pytest
+from core.responses import _json_array
+
+pytestmark = pytest.mark.anyio
+
+
+async def items(count: int):
+    for i in range(count):
+        yield {"id": i, "name": "x" * 100}
+
+
+async def test_stream_is_sent_in_large_chunks():
+    chunks = [chunk async for chunk in _json_array(items(2000), chunk_size=64 * 1024)]
+    body = b"".join(chunks)
+
+    assert len(chunks) == len(body) // (64 * 1024) + 1
+    assert body.startswith(b'[{"id":0,') and body.endswith(b"}]")
+    assert body.count(b'{"id"') == 2000
+
+
+async def test_empty_stream_is_an_empty_array():
+    assert [chunk async for chunk in _json_array(items(0))] == [b"[]"]
+
+
+async def test_encoded_responses_carry_a_weak_etag(client, db):
+    await db.products.insert_many([{"name": f"Ring {i}", "sku": f"RING-{i}", "price": 100, "stock": 1} for i in range(50)])
+
+    plain = await client.get("/api/products/all", headers={"Accept-Encoding": "identity"})
+    encoded = await client.get("/api/products/all", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in plain.headers
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.headers["etag"] == "W/" + plain.headers["etag"]
+
+    again = await client.get("/api/products/all", headers={"Accept-Encoding": "gzip", "If-None-Match": encoded.headers["etag"]})
+    assert again.status_code == 304
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from core.cpu_pool import CPUPool
+from controllers.ai_controller import DescriptionService
+
+pytestmark = pytest.mark.anyio
+
+
+async def wait_until_idle(pool: CPUPool):
+    for _ in range(200):
+        if pool.pending == 0:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def test_timed_out_call_counts_as_pending_until_its_thread_returns():
+    pool = CPUPool("test", workers=1, max_queue=0)
+    release = threading.Event()
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(release.wait, timeout=0.05)
+        assert pool.pending == 1
+
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(lambda: None)
+        assert rejected.value.status_code == 503
+
+        release.set()
+        await wait_until_idle(pool)
+        assert pool.pending == 0
+        assert await pool.run(lambda: 42) == 42
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+class HangingClient:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate(self, prompt: str) -> str:
+        self.release.wait()
+        return "late"
+
+
+async def test_description_timeout_keeps_the_admission_slot(db):
+    client = HangingClient()
+    service = DescriptionService(client, timeout=0.05)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await service.generate("Halo Ring", "Rings")
+        assert service.pool.pending == 1
+    finally:
+        client.release.set()
+        await wait_until_idle(service.pool)
+        service.pool.shutdown()
+    assert service.pool.pending == 0
@@ -0,0 +1,64 @@
+import pytest
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def upload(client, name: str, body: str):
+    response = await client.post(
+        "/api/products/import", files={"file": (name, body.encode())}, headers=auth("admin"),
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_csv_creates_products_and_partial_rows_update_them(client, db):
+    await db.categories.insert_one({"name": "Rings", "slug": "rings"})
+    created = await upload(client, "catalog.csv", (
+        "sku,name,price,stock,category,images\n"
+        "IMP-1,Solitaire Ring,250,4,rings,https://cdn.example.com/a.jpg|https://cdn.example.com/b.jpg\n"
+        "IMP-2,Halo Ring,300,2,,\n"
+    ))
+    assert (created["inserted"], created["updated"], created["failed"]) == (2, 0, 0)
+    ring = await db.products.find_one({"sku": "IMP-1"})
+    assert ring["images"] == ["https://cdn.example.com/a.jpg", "https://cdn.example.com/b.jpg"]
+    assert ring["featured"] is False and ring["category"]
+
+    # An existing sku only needs the columns it changes
+    updated = await upload(client, "prices.csv", "sku,price\nIMP-1,199\n")
+    assert (updated["inserted"], updated["updated"], updated["failed"]) == (0, 1, 0)
+    ring = await db.products.find_one({"sku": "IMP-1"})
+    assert (ring["price"], ring["stock"], ring["name"]) == (199, 4, "Solitaire Ring")
+
+
+async def test_ndjson_import(client, db):
+    report = await upload(client, "catalog.ndjson", (
+        '{"sku": "IMP-1", "name": "Pearl Drop", "price": 40, "stock": 3, "featured": true}\n'
+        "\n"
+        '{"sku": "IMP-1", "stock": 5}\n'
+    ))
+    assert (report["processed"], report["inserted"], report["failed"]) == (2, 1, 0)
+    pearl = await db.products.find_one({"sku": "IMP-1"})
+    assert (pearl["stock"], pearl["featured"], pearl["name"]) == (5, True, "Pearl Drop")
+
+
+async def test_bad_rows_are_reported_and_the_rest_imported(client, db):
+    report = await upload(client, "catalog.ndjson", "\n".join([
+        '{"sku": "IMP-1", "name": "Pearl Drop", "price": 40, "stock": 3}',
+        "not json",
+        '["a list"]',
+        '{"name": "No Sku", "price": 1, "stock": 1}',
+        '{"sku": "IMP-2", "price": 10}',
+        '{"sku": "IMP-3", "name": "Bad Price", "price": "cheap", "stock": 1}',
+        '{"sku": "IMP-4", "name": "Lost", "price": 1, "stock": 1, "category": "nowhere"}',
+    ]) + "\n")
+
+    assert (report["processed"], report["inserted"], report["failed"]) == (7, 1, 6)
+    errors = {e["row"]: e for e in report["errors"]}
+    assert errors[2]["error"] == "Invalid JSON"
+    assert errors[3]["error"] == "Expected a JSON object"
+    assert errors[4]["error"] == "sku is required for import"
+    assert errors[5]["sku"] == "IMP-2" and "name: Field required" in errors[5]["error"]
+    assert errors[6]["error"].startswith("price:")
+    assert errors[7]["error"] == "Unknown category 'nowhere'"
+    assert await db.products.count_documents({}) == 1
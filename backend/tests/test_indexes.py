@@ -0,0 +1,67 @@
+import pytest
+from pymongo import ASCENDING
+from core import indexes
+from core.indexes import ensure_indexes, index_drift, collection_scans, assert_no_collection_scans, _plan_stages
+from tests.conftest import requires_mongo
+
+pytestmark = pytest.mark.anyio
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {
+        "stage": "FETCH",
+        "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]},
+    }
+    assert list(_plan_stages(plan)) == ["FETCH", "OR", "IXSCAN", "COLLSCAN"]
+
+
+async def test_drift_reports_a_dropped_index(db):
+    await ensure_indexes()
+    await db.cart_items.drop_index("user_product")
+
+    drift = await index_drift()
+
+    assert drift["cart_items"]["missing"] == ["user_product"]
+
+
+async def test_drift_reports_an_undeclared_index(db):
+    await ensure_indexes()
+    await db.orders.create_index([("shipping_address", ASCENDING)], name="adhoc")
+
+    drift = await index_drift()
+
+    assert drift["orders"]["undeclared"] == ["adhoc"]
+
+
+@requires_mongo
+async def test_ensure_indexes_leaves_no_drift(db):
+    report = await ensure_indexes()
+
+    assert report == {"errors": {}, "drift": {}}
+
+
+@requires_mongo
+async def test_hot_queries_use_indexes(db):
+    await ensure_indexes()
+    await assert_no_collection_scans()
+
+
+@requires_mongo
+async def test_plan_check_flags_a_search_that_scans(db, monkeypatch):
+    await ensure_indexes()
+    await db.products.drop_index("stock_price")
+    monkeypatch.setattr(indexes, "HOT_QUERIES", [])
+    monkeypatch.setattr(indexes, "HOT_SEARCHES", [{"in_stock": True}])
+
+    offenders = await collection_scans()
+
+    assert {"collection": "products", "search": {"in_stock": True}, "part": "facets"} in offenders
+
+
+@requires_mongo
+async def test_plan_check_flags_an_unindexed_query(db, monkeypatch):
+    await ensure_indexes()
+    monkeypatch.setattr(indexes, "HOT_QUERIES", [("orders", {"shipping_address": "x"}, None)])
+    monkeypatch.setattr(indexes, "HOT_SEARCHES", [])
+
+    assert await collection_scans() == [{"collection": "orders", "query": {"shipping_address": "x"}, "sort": None}]
@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+from controllers.inventory_controller import sync_inventory
+from schemas.product_schema import InventoryItem
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed(db, sku: str, stock: int = 10, price: float = 100.0):
+    result = await db.products.insert_one({"name": sku, "sku": sku, "stock": stock, "price": price})
+    return result.inserted_id
+
+
+def statuses(report: dict) -> list:
+    return [r["status"] for r in report["results"]]
+
+
+async def test_items_are_classified_per_operation(db):
+    ring = await seed(db, "RING-1")
+    await seed(db, "RING-2", stock=1)
+    await seed(db, "RING-3", price=50.0)
+    await seed(db, "RING-5")
+
+    report = await sync_inventory([
+        InventoryItem(id=str(ring), stock=4),
+        InventoryItem(sku="RING-2", stock_delta=-3),
+        InventoryItem(sku="RING-3", price=60.0, expected_price=55.0),
+        InventoryItem(sku="RING-4", stock=1),
+        InventoryItem(sku="RING-5", stock_delta=2),
+    ])
+
+    assert statuses(report) == ["updated", "conflict", "conflict", "not_found", "updated"]
+    assert report["results"][0]["stock"] == 4
+    assert report["results"][4]["stock"] == 12
+    assert (await db.products.find_one({"sku": "RING-2"}))["stock"] == 1
+
+
+async def test_same_product_by_id_and_sku_is_a_duplicate(db):
+    ring = await seed(db, "RING-1")
+
+    report = await sync_inventory([InventoryItem(id=str(ring), stock=4), InventoryItem(sku="RING-1", stock=7)])
+
+    assert statuses(report) == ["updated", "duplicate"]
+    assert (await db.products.find_one({"_id": ring}))["stock"] == 4
+
+
+async def test_concurrent_batches_both_report_updated(db):
+    await seed(db, "RING-1")
+    await seed(db, "RING-2", stock=5)
+
+    first, second = await asyncio.gather(
+        sync_inventory([InventoryItem(sku="RING-1", stock_delta=1), InventoryItem(sku="RING-2", stock_delta=-1)]),
+        sync_inventory([InventoryItem(sku="RING-1", stock_delta=1), InventoryItem(sku="RING-2", stock_delta=-1)]),
+    )
+
+    assert statuses(first) == statuses(second) == ["updated", "updated"]
+    product = await db.products.find_one({"sku": "RING-1"})
+    assert product["stock"] == 12
+    assert set(product) == {"_id", "name", "sku", "stock", "price", "updated_at"}
@@ -0,0 +1,54 @@
+import threading
+from types import SimpleNamespace
+from core.metrics import MongoPoolListener
+
+PRIMARY = SimpleNamespace(address=("db-0", 27017))
+SECONDARY = SimpleNamespace(address=("db-1", 27017))
+
+
+def check_out(listener, event, count: int):
+    for _ in range(count):
+        listener.connection_check_out_started(event)
+        listener.connection_checked_out(event)
+
+
+def test_saturation_is_that_of_the_busiest_pool():
+    listener = MongoPoolListener(max_pool_size=10)
+    check_out(listener, PRIMARY, 6)
+    check_out(listener, SECONDARY, 5)
+    listener.connection_check_out_started(PRIMARY)
+
+    snapshot = listener.snapshot()
+    assert snapshot["checked_out"] == 11
+    assert snapshot["waiting"] == 1
+    assert snapshot["saturation"] == 0.6
+    assert snapshot["pools"]["db-0:27017"] == {"checked_out": 6, "waiting": 1}
+
+
+def test_closed_pools_are_forgotten():
+    listener = MongoPoolListener(max_pool_size=10)
+    check_out(listener, PRIMARY, 2)
+    check_out(listener, SECONDARY, 8)
+    listener.pool_closed(SECONDARY)
+
+    snapshot = listener.snapshot()
+    assert snapshot["saturation"] == 0.2
+    assert list(snapshot["pools"]) == ["db-0:27017"]
+
+
+def test_counts_survive_concurrent_driver_threads():
+    listener = MongoPoolListener(max_pool_size=10)
+
+    def churn():
+        for _ in range(2000):
+            listener.connection_check_out_started(PRIMARY)
+            listener.connection_checked_out(PRIMARY)
+            listener.connection_checked_in(PRIMARY)
+
+    threads = [threading.Thread(target=churn) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert listener.snapshot()["pools"]["db-0:27017"] == {"checked_out": 0, "waiting": 0}
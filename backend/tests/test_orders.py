@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime, timedelta
+from bson import ObjectId
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = ObjectId()
+
+
+async def seed_orders(db, count: int):
+    start = datetime(2026, 1, 1)
+    await db.orders.insert_many([
+        {"user_id": USER_ID, "items": [], "total_price": float(i), "shipping_address": "1 Test Street",
+         "status": "Pending", "created_at": start + timedelta(minutes=i)}
+        for i in range(count)
+    ])
+
+
+async def test_orders_without_limit_returns_every_order(client, db):
+    await seed_orders(db, 120)
+
+    response = await client.get("/api/orders/all-orders", headers=auth(user_id=USER_ID))
+
+    assert response.status_code == 200
+    orders = response.json()
+    assert len(orders) == 120
+    assert orders[0]["total_price"] == 119.0  # newest first
+    assert "x-next-cursor" not in response.headers
+
+
+async def test_orders_pages_with_limit_and_cursor(client, db):
+    await seed_orders(db, 120)
+
+    first = await client.get("/api/orders/all-orders", params={"limit": 50}, headers=auth(user_id=USER_ID))
+    cursor = first.headers["x-next-cursor"]
+    rest = await client.get("/api/orders/all-orders", params={"after": cursor}, headers=auth(user_id=USER_ID))
+
+    assert len(first.json()) == 50
+    assert [o["total_price"] for o in rest.json()] == [float(i) for i in range(69, -1, -1)]
+
+
+async def test_admin_orders_reject_a_bad_cursor(client, db):
+    response = await client.get("/api/orders/all-users-orders", params={"after": "nope"}, headers=auth("admin"))
+
+    assert response.status_code == 400
@@ -0,0 +1,17 @@
+import json
+import pytest
+from benchmarks.payload_budget import ADMIN_ID, BUDGET_FILE, USER_ID, check, measure, seed
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_endpoints_stay_within_budget_through_compression(client, db):
+    await seed(db)
+    report = await measure(client, {"user": auth(user_id=USER_ID), "admin": auth("admin", user_id=ADMIN_ID)})
+    with open(BUDGET_FILE) as f:
+        budget = json.load(f)
+
+    assert check(report, budget) == []
+    # The streamed catalog goes out encoded, close to what gzip gets offline
+    assert report["products_all"]["wire_bytes"] < report["products_all"]["gzip_bytes"] * 1.1
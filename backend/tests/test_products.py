@@ -0,0 +1,30 @@
+import pytest
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+def product_form(sku: str) -> dict:
+    return {"name": "Solitaire Ring", "price": 250, "category": "rings", "stock": 5, "sku": sku}
+
+
+async def test_duplicate_sku_on_create_is_a_400(client, db):
+    first = await client.post("/api/products/add-product", data=product_form("DUP-1"), headers=auth("admin"))
+    assert first.status_code == 200
+
+    again = await client.post("/api/products/add-product", data=product_form("DUP-1"), headers=auth("admin"))
+    assert again.status_code == 400
+    assert again.json()["detail"] == "SKU already exists"
+    assert await db.products.count_documents({"sku": "DUP-1"}) == 1
+
+
+async def test_duplicate_sku_on_update_is_a_400(client, db):
+    await client.post("/api/products/add-product", data=product_form("DUP-1"), headers=auth("admin"))
+    await client.post("/api/products/add-product", data=product_form("DUP-2"), headers=auth("admin"))
+    second = await db.products.find_one({"sku": "DUP-2"})
+
+    response = await client.put(
+        f"/api/products/update-product/{second['_id']}", data=product_form("DUP-1"), headers=auth("admin"),
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "SKU already exists"
@@ -0,0 +1,77 @@
+import pytest
+from core import rate_limit
+from core.rate_limit import MemoryBuckets, MongoBuckets, RateLimit
+
+pytestmark = pytest.mark.anyio
+
+LIMIT = RateLimit("test", count=3, period=60)  # one token every 20s, bursts of 3
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+async def drain(buckets, key: str = "ip:1") -> list:
+    return [await buckets.acquire(key, LIMIT) for _ in range(4)]
+
+
+async def test_memory_bucket_allows_a_burst_then_refills_one_interval_at_a_time(clock):
+    buckets = MemoryBuckets()
+    assert await drain(buckets) == [0.0, 0.0, 0.0, 20.0]
+
+    clock.now += 5
+    assert await buckets.acquire("ip:1", LIMIT) == 15.0
+    clock.now += 15
+    assert await buckets.acquire("ip:1", LIMIT) == 0.0
+    assert await buckets.acquire("ip:1", LIMIT) == 20.0
+
+    # A bucket left alone for a whole period is full again, never fuller
+    clock.now += 600
+    assert await drain(buckets) == [0.0, 0.0, 0.0, 20.0]
+
+
+async def test_memory_buckets_stay_bounded_when_nothing_has_refilled(clock):
+    buckets = MemoryBuckets(max_keys=10)
+    for i in range(10):
+        await buckets.acquire(f"ip:{i}", LIMIT)
+    await buckets.acquire("ip:0", LIMIT)  # recently used, so kept
+
+    for i in range(10, 15):
+        assert await buckets.acquire(f"ip:{i}", LIMIT) == 0.0
+        assert len(buckets._tat) <= 10
+    assert "ip:0" in buckets._tat
+    assert "ip:1" not in buckets._tat
+
+
+async def test_mongo_bucket_matches_the_memory_math(db, clock):
+    buckets = MongoBuckets(db.rate_limits)
+    assert await drain(buckets) == [0.0, 0.0, 0.0, 20.0]
+
+    clock.now += 20
+    assert await buckets.acquire("ip:1", LIMIT) == 0.0
+    assert await buckets.acquire("ip:1", LIMIT) == 20.0
+
+
+async def test_mongo_bucket_never_spends_a_token_another_worker_took(db, clock, monkeypatch):
+    buckets = MongoBuckets(db.rate_limits)
+    assert await drain(buckets) == [0.0, 0.0, 0.0, 20.0]
+    spent = (await db.rate_limits.find_one({"_id": "ip:1"}))["tat"]
+
+    # This worker read the bucket before the others drained it
+    async def stale_clamp(key, now, limit):
+        return now
+
+    monkeypatch.setattr(buckets, "_clamp", stale_clamp)
+    assert await buckets.acquire("ip:1", LIMIT) == LIMIT.interval
+    assert (await db.rate_limits.find_one({"_id": "ip:1"}))["tat"] == spent
@@ -0,0 +1,49 @@
+import pytest
+from bson import ObjectId
+from controllers.search_controller import facet_options, search_filter
+
+pytestmark = pytest.mark.anyio
+
+RINGS, NECKLACES = ObjectId(), ObjectId()
+
+
+async def seed_catalog(db):
+    await db.categories.insert_many([
+        {"_id": RINGS, "name": "Rings", "slug": "rings"},
+        {"_id": NECKLACES, "name": "Necklaces", "slug": "necklaces"},
+    ])
+    await db.products.insert_many([
+        {"name": f"Piece {i}", "price": 50.0 * (i + 1), "category": str(RINGS if i % 2 else NECKLACES),
+         "sku": f"SEARCH-{i}", "stock": i % 3, "featured": i == 0, "images": []}
+        for i in range(10)
+    ])
+
+
+async def test_search_pages_in_sort_order_with_facets_over_every_match(client, db):
+    await seed_catalog(db)
+
+    response = await client.get("/api/products/search", params={
+        "category": "rings", "sort": "price_desc", "skip": 1, "limit": 2,
+    })
+
+    body = response.json()
+    assert [p["price"] for p in body["results"]] == [400.0, 300.0]
+    assert body["total"] == 5
+    assert body["facets"]["categories"] == [{"id": str(RINGS), "name": "Rings", "slug": "rings", "count": 5}]
+    assert sum(b["count"] for b in body["facets"]["price"]) == 5
+
+
+async def test_search_filters_combine(client, db):
+    await seed_catalog(db)
+
+    response = await client.get("/api/products/search", params={"in_stock": "true", "max_price": 300})
+
+    assert sorted(p["price"] for p in response.json()["results"]) == [100.0, 150.0, 250.0, 300.0]
+
+
+async def test_facets_use_the_covering_index_only_for_category_and_price_filters(db):
+    covered = await search_filter(category=str(RINGS), min_price=10)
+    uncovered = await search_filter(category=str(RINGS), in_stock=True)
+
+    assert facet_options(covered) == {"hint": "category_price"}
+    assert facet_options(uncovered) == {}
@@ -0,0 +1,145 @@
+import io
+import threading
+import time
+from typing import List
+import httpx
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from routes import categories
+from core.upload_service import LocalBackend, UploadService, UploadSizeMiddleware
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+class StubVariants:
+    """Two sizes in one format, without decoding anything."""
+
+    def generate(self, data: bytes):
+        return (800, 800), [
+            {"name": name, "format": "webp", "width": edge, "height": edge, "data": data[:edge]}
+            for name, edge in (("thumbnail", 200), ("card", 600))
+        ]
+
+
+class RecordingBackend(LocalBackend):
+    def __init__(self, root, fail_on: str = None):
+        super().__init__(root=str(root), latency=0.05)
+        self.fail_on = fail_on
+        self.in_flight = 0
+        self.peak = 0
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def upload(self, data: bytes, folder: str, filename: str = "") -> dict:
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.fail_on and filename.startswith(self.fail_on):
+                time.sleep(0.01)
+                raise RuntimeError("storage unavailable")
+            return super().upload(data, folder, filename)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def delete(self, public_id: str):
+        self.deleted.append(public_id)
+        super().delete(public_id)
+
+
+def image_file(name: str = "ring.jpg") -> UploadFile:
+    return UploadFile(io.BytesIO(b"x" * 1024), filename=name)
+
+
+async def test_variants_upload_concurrently(tmp_path):
+    backend = RecordingBackend(tmp_path)
+    service = UploadService(backend, StubVariants(), concurrency=1)
+
+    stored = await service.upload_one(image_file(), "products")
+
+    assert backend.peak == 3
+    assert [v["name"] for v in stored["variants"]] == ["thumbnail", "card"]
+    assert all(v["url"] and "data" not in v for v in stored["variants"])
+    assert (stored["width"], stored["height"]) == (800, 800)
+
+
+async def test_failed_variant_discards_the_rest(tmp_path):
+    backend = RecordingBackend(tmp_path, fail_on="card")
+    service = UploadService(backend, StubVariants())
+
+    with pytest.raises(HTTPException) as failed:
+        await service.upload_one(image_file(), "products")
+
+    assert failed.value.status_code == 500
+    assert len(backend.deleted) == 2
+
+
+async def test_category_variants_use_the_product_record_list(client, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(categories, "upload_service", UploadService(RecordingBackend(tmp_path), StubVariants()))
+
+    response = await client.post(
+        "/api/category/add-category",
+        data={"name": "Rings", "slug": "rings"},
+        files={"image": ("ring.jpg", b"x" * 1024, "image/jpeg")},
+        headers=auth("admin"),
+    )
+    assert response.status_code == 200
+    category = await db.categories.find_one({"slug": "rings"})
+    assert isinstance(category["image_variants"], list)
+    assert category["image_variants"][0]["url"] == category["image"]
+    assert response.json()["thumbnail"] == category["image_variants"][0]["variants"][0]["url"]
+
+    updated = await client.put(
+        f"/api/category/update-category/{category['_id']}",
+        data={"name": "Rings", "slug": "rings", "image_url_existing": "https://example.com/other.jpg"},
+        headers=auth("admin"),
+    )
+    assert updated.status_code == 200
+    category = await db.categories.find_one({"slug": "rings"})
+    assert category["image_variants"] == []
+    assert category["thumbnail"] is None
+
+
+def guarded_app(max_bytes: int):
+    app = FastAPI()
+
+    @app.post("/api/products/add-product")
+    async def add_product(images: List[UploadFile] = File(None)):
+        return {"files": len(images or [])}
+
+    return UploadSizeMiddleware(app, max_bytes=max_bytes)
+
+
+async def test_declared_oversized_upload_is_refused_unread():
+    transport = httpx.ASGITransport(app=guarded_app(1024))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/products/add-product", files={"images": ("ring.jpg", b"x" * 4096)})
+    assert response.status_code == 413
+
+
+async def test_streamed_oversized_upload_is_refused_before_parsing():
+    sent = []
+
+    async def body():
+        yield b'--xyz\r\nContent-Disposition: form-data; name="images"; filename="ring.jpg"\r\n\r\n'
+        for _ in range(64):
+            sent.append(1)
+            yield b"x" * 1024
+
+    transport = httpx.ASGITransport(app=guarded_app(4096))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/products/add-product", content=body(),
+            headers={"Content-Type": "multipart/form-data; boundary=xyz"},
+        )
+    assert response.status_code == 413
+    assert len(sent) < 64
+
+
+async def test_small_upload_passes_the_guard():
+    transport = httpx.ASGITransport(app=guarded_app(64 * 1024))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/api/products/add-product", files={"images": ("ring.jpg", b"x" * 4096)})
+    assert response.json() == {"files": 1}